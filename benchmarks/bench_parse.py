@@ -0,0 +1,64 @@
+"""Time scraper.parse_products() on saved or synthetic collection pages.
+
+Save real pages with `python scraper.py --save-pages benchmarks/pages` and
+pass that folder; without one, synthetic pages are generated.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import scraper
+from fixtures import collection_page, synthetic_products
+
+
+def load_pages(folder):
+    """Return the HTML of every saved page in `folder`, or synthetic pages."""
+    if folder:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(folder, "*.html"))):
+            with open(path, "r", encoding="utf-8") as f:
+                pages.append(f.read())
+        return pages
+    return [collection_page(synthetic_products(48, start=n * 48 + 1), page=n + 1, has_next=True) for n in range(5)]
+
+
+def time_per_page(func, pages, repeat):
+    """Return the best mean time per page (seconds) over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            func(html)
+        best = min(best, (time.perf_counter() - start) / len(pages))
+    return best
+
+
+def main(folder=None, repeat=5):
+    pages = load_pages(folder)
+    if not pages:
+        print(f"No .html pages found in {folder}")
+        return
+
+    engines = [("html.parser", lambda html: scraper.parse_products(BeautifulSoup(html, "html.parser")))]
+    if scraper.lxml_etree is not None:
+        engines.append(("lxml", scraper.parse_products))
+
+    print(f"Parsing {len(pages)} page(s), best of {repeat}")
+    print("=" * 50)
+    for name, func in engines:
+        products = sum(len(func(html)) for html in pages)
+        print(f"{name:<12} {time_per_page(func, pages, repeat) * 1000:8.2f} ms/page  ({products} products)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark product extraction on collection pages")
+    parser.add_argument("pages", nargs="?", help="folder of saved collection page .html files")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.pages, args.repeat)
@@ -0,0 +1,247 @@
+"""Benchmark the scraper, downloader and generator hot paths on synthetic catalogs.
+
+Fixtures (products.csv, a row-numbered image folder and saved collection
+pages) are generated once per catalog size under benchmarks/data/. Each
+benchmark reports its best time over `--repeat` runs and the peak Python
+heap traced by tracemalloc during one more run (memory held by C
+libraries such as lxml is not counted). Results are saved as JSON in
+benchmarks/results/ and compared with the previous run.
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+import categories
+import download_images
+import generate_gallery
+import scraper
+from fixtures import ImageServer, write_catalog, write_images, write_pages
+
+# Configuration
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(HERE, "data")
+RESULTS_FOLDER = os.path.join(HERE, "results")
+SIZES = [1_000, 10_000, 100_000]
+DOWNLOAD_MAX = 10_000   # Larger catalogs download only their first rows
+REGRESSION = 0.10       # Slower than the previous run by more than this is flagged
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """Run the block in `path`: the scripts under test use relative paths."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def prepare(size):
+    """Generate (once) and return the fixture folder for a catalog of `size` products."""
+    folder = os.path.join(DATA_FOLDER, str(size))
+    marker = os.path.join(folder, ".complete")
+    if os.path.exists(marker):
+        return folder
+    print(f"Generating fixtures for {size:,} products in {folder}")
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    write_catalog(os.path.join(folder, "products.csv"), size)
+    write_images(os.path.join(folder, "images"), size)
+    write_pages(os.path.join(folder, "pages"), size)
+    open(marker, "w").close()
+    return folder
+
+
+def load_csv(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def measure(run, repeat, setup=None):
+    """Time `run` (best of `repeat`), then trace one more run for its peak memory."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "mean_seconds": statistics.mean(times), "peak_bytes": peak}
+
+
+def bench_parse_products(folder, size, repeat):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, "pages", "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    if scraper.lxml_etree is not None:
+        parse = scraper.parse_products
+    else:
+        def parse(html):
+            return scraper.parse_products(BeautifulSoup(html, "html.parser"))
+
+    def run():
+        for html in pages:
+            parse(html)
+    return dict(measure(run, repeat), pages=len(pages))
+
+
+def bench_generate_html(folder, size, repeat):
+    with working_directory(folder):
+        products = load_csv("products.csv")
+        image_paths = generate_gallery.resolve_images(products)
+    thumbnails = [{}] * len(products)
+    return measure(lambda: generate_gallery.generate_html(products, image_paths, thumbnails), repeat,
+                   setup=categories._default.cache.clear)
+
+
+def bench_build_feed(folder, size, repeat):
+    with working_directory(folder):
+        products = load_csv("products.csv")
+        image_paths = generate_gallery.resolve_images(products)
+    thumbnails = [{}] * len(products)
+
+    def run():
+        generate_gallery.build_search_index(generate_gallery.build_feed(products, image_paths, thumbnails))
+    return measure(run, repeat, setup=categories._default.cache.clear)
+
+
+def bench_get_category(folder, size, repeat):
+    titles = [product["title"] for product in load_csv(os.path.join(folder, "products.csv"))]
+
+    def run():
+        for title in titles:
+            categories.get_category(title)
+    return measure(run, repeat, setup=categories._default.cache.clear)
+
+
+def bench_download_images(folder, size, repeat):
+    """Download every image of the catalog from a local stand-in CDN into an empty store."""
+    count = min(size, DOWNLOAD_MAX)
+    workdir = os.path.join(folder, "download")
+    with ImageServer() as server:
+        def setup():
+            shutil.rmtree(workdir, ignore_errors=True)
+            os.makedirs(workdir)
+            write_catalog(os.path.join(workdir, "products.csv"), count, server.host)
+
+        def run():
+            with working_directory(workdir), contextlib.redirect_stdout(io.StringIO()):
+                # No rate limit: the stand-in is local, the point is our own overhead
+                download_images.main(workers=download_images.MAX_WORKERS, rate=1e9)
+
+        result = measure(run, repeat, setup)
+    downloaded = len(glob.glob(os.path.join(workdir, "images", "blobs", "**", "*.png"), recursive=True))
+    shutil.rmtree(workdir, ignore_errors=True)
+    return dict(result, products=count, downloaded=downloaded)
+
+
+BENCHMARKS = {
+    "parse_products": bench_parse_products,
+    "generate_html": bench_generate_html,
+    "build_feed": bench_build_feed,
+    "get_category": bench_get_category,
+    "download_images": bench_download_images,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results():
+    """Return the results of the latest saved run, or {}."""
+    files = sorted(glob.glob(os.path.join(RESULTS_FOLDER, "bench-*.json")))
+    if not files:
+        return {}
+    with open(files[-1], "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(result, previous):
+    """Describe the change from the previous run's time, flagging regressions."""
+    if not previous or not previous.get("seconds"):
+        return ""
+    change = result["seconds"] / previous["seconds"] - 1
+    flag = "  REGRESSION" if change > REGRESSION else ""
+    return f"{change:+7.1%}{flag}"
+
+
+def main(sizes=SIZES, only=None, repeat=3, download_repeat=1):
+    names = only or list(BENCHMARKS)
+    previous = previous_results()
+    results = {name: {} for name in names}
+    started = datetime.datetime.now()
+
+    print(f"Benchmarks: {', '.join(names)}; sizes: {', '.join(f'{size:,}' for size in sizes)}")
+    print("=" * 50)
+    for size in sizes:
+        folder = prepare(size)
+        for name in names:
+            runs = download_repeat if name == "download_images" else repeat
+            result = BENCHMARKS[name](folder, size, runs)
+            results[name][str(size)] = result
+            delta = compare(result, previous.get(name, {}).get(str(size)))
+            print(f"{name:<16} {size:>8,} {result['seconds'] * 1000:11.1f} ms "
+                  f"{result['peak_bytes'] / 2**20:9.1f} MiB  {delta}")
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    output = os.path.join(RESULTS_FOLDER, f"bench-{started:%Y%m%d-%H%M%S}.json")
+    report = {
+        "started": started.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lxml": scraper.lxml_etree is not None,
+        "results": results,
+    }
+    tmp_file = output + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    os.replace(tmp_file, output)
+    print("=" * 50)
+    print(f"Results saved to: {os.path.relpath(output)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper, downloader and generator on synthetic catalogs")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=SIZES,
+                        help="comma-separated catalog sizes (default: %s)" % ",".join(map(str, SIZES)))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark; the best is kept")
+    parser.add_argument("--download-repeat", type=int, default=1,
+                        help=f"timed runs of download_images (at most {DOWNLOAD_MAX:,} images each)")
+    args = parser.parse_args()
+    main(sizes=args.sizes, only=args.only, repeat=args.repeat, download_repeat=args.download_repeat)
@@ -0,0 +1,146 @@
+"""Synthetic stand-ins for the Shopify collection pages, catalogs and image CDN."""
+import csv
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PRODUCTS_PER_PAGE = 48
+
+
+def product_card(handle, title, image_url):
+    """Render one collection grid item in the theme's nested markup."""
+    return f'''<li class="grid__item">
+  <div class="card-wrapper product-card-wrapper">
+    <div class="card card--media">
+      <div class="card__inner"><div class="card__media"><div class="media media--transparent">
+        <img srcset="{image_url}&width=165 165w, {image_url}&width=360 360w" src="{image_url}&width=533" alt="" class="motion-reduce" loading="lazy">
+      </div></div></div>
+      <div class="card__content"><div class="card__information">
+        <h3 class="card__heading"><a href="/products/{handle}" class="full-unstyled-link">{title}</a></h3>
+        <div class="price"><span class="price-item">$ 99.00</span></div>
+        <div class="quick-add"><a href="/products/{handle}" class="quick-add__link">Choose options</a></div>
+      </div></div>
+    </div>
+  </div>
+</li>'''
+
+
+def collection_page(products, page=1, has_next=False):
+    """Render a collection page for `products`, a list of (handle, title, image_url)."""
+    cards = "\n".join(product_card(*product) for product in products)
+    next_link = f'<a href="?page={page + 1}" class="pagination__item--next">Next</a>' if has_next else ""
+    return f'''<!doctype html>
+<html><head><title>Collections - page {page}</title></head>
+<body>
+<header class="header"><a href="/">Home</a><a href="/collections">Shop</a></header>
+<main>
+<div class="collection product-grid-container">
+<ul id="product-grid" class="grid product-grid grid--4-col-desktop">
+{cards}
+</ul>
+</div>
+<nav class="pagination">{next_link}</nav>
+</main>
+<footer class="footer"><a href="/pages/contact">Contact</a></footer>
+</body></html>'''
+
+
+def synthetic_products(count, host="https://shop.example.com", start=1, ext="jpg"):
+    """Return `count` fake (handle, title, image_url) tuples."""
+    textures = ["Straight", "Body Wave", "Deep Wave", "Loose Wave", "Curly", "Kinky Straight"]
+    origins = ["Brazilian", "Peruvian", "Malaysian", "Indian"]
+    kinds = ["Bundle", "4x4 HD Lace Closure", "13x4 Lace Frontal", "Lace Front Wig"]
+    products = []
+    for n in range(start, start + count):
+        title = f"Virgin {origins[n % len(origins)]} {textures[n % len(textures)]} {kinds[n % len(kinds)]} {n}"
+        handle = title.lower().replace(" ", "-")
+        products.append((handle, title, f"{host}/cdn/shop/files/product_{n}.{ext}?v=1"))
+    return products
+
+
+def tiny_png(n, size=8):
+    """A small solid PNG whose colour encodes `n`, so every image is distinct."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes((n & 255, (n >> 8) & 255, (n >> 16) & 255)) * size
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * size))
+            + chunk(b"IEND", b""))
+
+
+def write_catalog(path, count, host="https://shop.example.com"):
+    """Write a products.csv of `count` synthetic products whose images are PNGs on `host`."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "image", "handle"])
+        for handle, title, image_url in synthetic_products(count, host, ext="png"):
+            writer.writerow([title, image_url, handle])
+
+
+def write_images(folder, count):
+    """Fill `folder` with row-numbered images (``0001_<title>.png``) for `count` products."""
+    os.makedirs(folder, exist_ok=True)
+    for n, (handle, _, _) in enumerate(synthetic_products(count), 1):
+        with open(os.path.join(folder, f"{n:04d}_{handle}.png"), "wb") as f:
+            f.write(tiny_png(n))
+
+
+def write_pages(folder, count):
+    """Save the collection pages listing `count` products, PRODUCTS_PER_PAGE per page."""
+    os.makedirs(folder, exist_ok=True)
+    pages = (count + PRODUCTS_PER_PAGE - 1) // PRODUCTS_PER_PAGE
+    for page in range(1, pages + 1):
+        start = (page - 1) * PRODUCTS_PER_PAGE + 1
+        products = synthetic_products(min(PRODUCTS_PER_PAGE, count - start + 1), start=start)
+        with open(os.path.join(folder, f"page-{page:04d}.html"), "w", encoding="utf-8") as f:
+            f.write(collection_page(products, page, has_next=page < pages))
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        match = re.match(r"/cdn/shop/files/product_(\d+)\.png", self.path)
+        if not match:
+            self.send_error(404)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = tiny_png(int(match[1]))
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", f'"{match[1]}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ImageServer:
+    """Local stand-in for the shop's image CDN, serving generated PNGs.
+
+    Use as a context manager; `host` is the base URL to put in a catalog.
+    `latency` (seconds) delays each response, to mimic a real network.
+    """
+
+    def __init__(self, latency=0.0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
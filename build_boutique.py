@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import re
+
+import templates
+from categories import classify
+from generate_gallery import fingerprint, write_if_changed
+from image_store import file_digest
+from thumbnails import IMAGE_EXTENSIONS, SIZES, load_manifest, srcsets
+
+try:
+    from PIL import Image
+except ImportError:  # Dimensions then come from the thumbnail manifest only
+    Image = None
+
+# Configuration
+# Source folders; each one's category id comes from categories.CATEGORY_RULES
+FOLDERS = ["Sandales", "Bags"]
+DATA_FOLDER = "boutique-data"
+MANIFEST_FILE = f"{DATA_FOLDER}/manifest.json"
+PAGES = ["boutique.html", "shop.html"]
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/400x400?text=Image"
+# The generated cards sit between these markers in every page
+START_MARKER = "<!-- BOUTIQUE CARDS: generated by build_boutique.py"
+END_MARKER = "<!-- END BOUTIQUE CARDS -->"
+
+
+def display_name(filename):
+    """Turn ``0002_COACH BAG .jpeg`` into ``COACH BAG``."""
+    name = os.path.splitext(filename)[0]
+    name = re.sub(r"^\d+_?", "", name).replace("_", " ")
+    return " ".join(name.split())
+
+
+def image_size(path, thumb):
+    """Return `(width, height)` of an image, from its thumbnail entry if current."""
+    stat = os.stat(path)
+    if thumb and thumb["size"] == stat.st_size and thumb["mtime"] == stat.st_mtime_ns:
+        return thumb["width"], thumb["height"]
+    if Image is None:
+        return None, None
+    with Image.open(path) as img:
+        return img.size
+
+
+def folder_category(folder):
+    """The category id of a source folder, as the title classifier names it ("Bags" -> "bag")."""
+    return classify(folder)[0]
+
+
+def missing_filters(page, categories):
+    """Categories that `page` has no ``setFilter('<id>')`` button for."""
+    with open(page, "r", encoding="utf-8") as f:
+        content = f.read()
+    return sorted(category for category in categories if f"setFilter('{category}')" not in content)
+
+
+def scan(folders=FOLDERS):
+    """List every product image below `folders`, in file name order."""
+    thumbs = load_manifest()
+    items = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        category = folder_category(folder)
+        names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names:
+            path = f"{folder}/{name}"
+            width, height = image_size(path, thumbs.get(path))
+            item = {
+                "id": len(items) + 1,
+                "title": display_name(name),
+                "category": category,
+                "folder": folder,
+                "file": name,
+                "hash": file_digest(path)[:16],
+                "width": width,
+                "height": height,
+            }
+            item_thumbs = srcsets(thumbs.get(path))
+            if item_thumbs:
+                item["thumbs"] = item_thumbs
+            items.append(item)
+    return items
+
+
+def render_card(template, item):
+    """Render an item's card from a template, with AVIF/WebP thumbnails when built and its size to reserve space."""
+    return templates.render(template, item=item, src=f"{item['folder']}/{item['file']}", alt=item["title"],
+                            thumbs=item.get("thumbs", {}), width=item["width"], height=item["height"],
+                            sizes=SIZES, fallback=PLACEHOLDER_IMAGE)
+
+
+# Card template of each page: boutique.html's script opens its modal, shop.html's buttons click the image
+TEMPLATES = {"boutique.html": "boutique_card.html", "shop.html": "shop_card.html"}
+
+
+def splice(page, cards, version, force=False):
+    """Replace the generated block of `page` with `cards`.
+
+    Returns True if the page was rewritten; unless `force`, a page whose
+    block was already built from this version is left alone.
+    """
+    with open(page, "r", encoding="utf-8") as f:
+        content = f.read()
+    start = content.find(START_MARKER)
+    end = content.find(END_MARKER, start)
+    if start < 0 or end < 0:
+        raise ValueError(f"{page} has no generated cards block")
+    marker = f"{START_MARKER} ({version}) -->"
+    if content.startswith(marker, start) and not force:
+        return False
+
+    indent = content[content.rfind("\n", 0, start) + 1:start]
+    block = marker + "".join("\n" + card for card in cards) + "\n" + indent
+    tmp_file = page + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(content[:start] + block + content[end:])
+    os.replace(tmp_file, page)
+    return True
+
+
+def main(force=False):
+    items = scan()
+    version = fingerprint(items)[:12]
+    print(f"Found {len(items)} products in {', '.join(FOLDERS)}")
+    print("=" * 50)
+
+    os.makedirs(DATA_FOLDER, exist_ok=True)
+    manifest = json.dumps({"version": version, "items": items}, ensure_ascii=False, separators=(",", ":"))
+    if write_if_changed(MANIFEST_FILE, manifest):
+        print(f"Wrote {MANIFEST_FILE}")
+
+    # Pages are re-rendered when the items or the card templates change
+    cards_version = fingerprint(version, templates.version())[:12]
+    for page in PAGES:
+        cards = [render_card(TEMPLATES[page], item) for item in items]
+        if splice(page, cards, cards_version, force):
+            print(f"{page}: rendered {len(cards)} cards")
+        else:
+            print(f"{page}: up to date")
+        missing = missing_filters(page, {item["category"] for item in items})
+        if missing:
+            print(f"{page}: no filter button for {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the boutique and shop cards from the Sandales/ and Bags/ folders")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite the pages even if their cards are up to date")
+    args = parser.parse_args()
+    main(force=args.force)
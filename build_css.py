@@ -0,0 +1,467 @@
+import argparse
+import os
+import re
+
+from generate_gallery import write_if_changed
+
+# Configuration
+PAGES = ["index.html", "shop.html", "boutique.html", "gallery.html", "contact.html", "view_image.html"]
+CSS_FILE = "assets/site.css"
+# The stylesheet links sit between these markers in every page's <head>
+START_MARKER = "<!-- SITE CSS: generated by build_css.py -->"
+END_MARKER = "<!-- END SITE CSS -->"
+CRITICAL_CHARS = 16384   # Leading characters of <body> treated as above the fold
+
+BREAKPOINTS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px"}
+STATES = {"hover": ":hover", "focus": ":focus"}
+
+# Tailwind's default palette (the shades in use and their neighbours) plus the site colours
+COLORS = {
+    "black": "#000000", "white": "#ffffff", "transparent": "transparent",
+    "primary": "#000000", "gold": "#d4af37", "gold-dark": "#b8960c",
+}
+PALETTE = {
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87",
+}
+for hue, shades in PALETTE.items():
+    for shade, value in zip((50, 100, 200, 300, 400, 500, 600, 700, 800, 900), shades.split()):
+        COLORS[f"{hue}-{shade}"] = f"#{value}"
+
+SPACING = {"0": "0px", "px": "1px"}
+for step in (0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20, 24, 28, 32,
+             36, 40, 44, 48, 52, 56, 60, 64, 72, 80, 96):
+    SPACING[f"{step:g}"] = f"{step / 4:g}rem"
+
+FONT_SIZES = {
+    "xs": ".75rem;line-height:1rem", "sm": ".875rem;line-height:1.25rem",
+    "base": "1rem;line-height:1.5rem", "lg": "1.125rem;line-height:1.75rem",
+    "xl": "1.25rem;line-height:1.75rem", "2xl": "1.5rem;line-height:2rem",
+    "3xl": "1.875rem;line-height:2.25rem", "4xl": "2.25rem;line-height:2.5rem",
+    "5xl": "3rem;line-height:1", "6xl": "3.75rem;line-height:1", "7xl": "4.5rem;line-height:1",
+}
+MAX_WIDTHS = {
+    "none": "none", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+    "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+    "full": "100%",
+}
+RADII = {"": ".25rem", "none": "0px", "sm": ".125rem", "md": ".375rem", "lg": ".5rem",
+         "xl": ".75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / .05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / .1),0 1px 2px -1px rgb(0 0 0 / .1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / .1),0 2px 4px -2px rgb(0 0 0 / .1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / .1),0 4px 6px -4px rgb(0 0 0 / .1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / .1),0 8px 10px -6px rgb(0 0 0 / .1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / .25)",
+    "none": "0 0 #0000",
+}
+TRANSFORM = "translate(var(--tw-translate-x),var(--tw-translate-y)) scale(var(--tw-scale-x),var(--tw-scale-y))"
+EASE = "transition-timing-function:cubic-bezier(.4,0,.2,1);transition-duration:150ms"
+TRANSITIONS = {
+    "": "color,background-color,border-color,text-decoration-color,fill,stroke,opacity,box-shadow,transform,filter,backdrop-filter",
+    "all": "all", "colors": "color,background-color,border-color,text-decoration-color,fill,stroke",
+    "opacity": "opacity", "shadow": "box-shadow", "transform": "transform",
+}
+SIDES = {"t": ("top",), "r": ("right",), "b": ("bottom",), "l": ("left",),
+         "x": ("left", "right"), "y": ("top", "bottom")}
+CORNERS = {"t": ("top-left", "top-right"), "r": ("top-right", "bottom-right"),
+           "b": ("bottom-right", "bottom-left"), "l": ("top-left", "bottom-left")}
+
+# Abridged Tailwind preflight: the resets the pages were designed against
+PREFLIGHT = (
+    "*,::before,::after{box-sizing:border-box;border:0 solid #e5e7eb;"
+    "--tw-translate-x:0;--tw-translate-y:0;--tw-scale-x:1;--tw-scale-y:1}"
+    "html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;"
+    "font-family:ui-sans-serif,system-ui,sans-serif,\"Apple Color Emoji\",\"Segoe UI Emoji\"}"
+    "body{margin:0;line-height:inherit}"
+    "hr{height:0;color:inherit;border-top-width:1px}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "a{color:inherit;text-decoration:inherit}"
+    "b,strong{font-weight:bolder}"
+    "button,input,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;"
+    "line-height:inherit;color:inherit;margin:0;padding:0}"
+    "button,[type=button],[type=submit]{-webkit-appearance:button;background-color:transparent;background-image:none}"
+    "blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}"
+    "ol,ul{list-style:none;margin:0;padding:0}"
+    "textarea{resize:vertical}"
+    "input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}"
+    "button,[role=button]{cursor:pointer}"
+    "img,svg,video,canvas,iframe,embed,object{display:block;vertical-align:middle}"
+    "img,video{max-width:100%;height:auto}"
+    "[hidden]{display:none}"
+)
+
+
+def arbitrary(value):
+    """``[85vw]`` -> ``85vw``; underscores stand for spaces, as in Tailwind."""
+    if len(value) > 2 and value[0] == "[" and value[-1] == "]":
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def color(value):
+    """Resolve ``gold``, ``black/70`` or ``gray-800`` to a CSS colour, or None."""
+    name, _, alpha = value.partition("/")
+    hex_value = COLORS.get(name)
+    if hex_value is None or (alpha and not alpha.isdigit()):
+        return None
+    if not alpha:
+        return hex_value
+    r, g, b = (0, 0, 0) if hex_value == "transparent" else (int(hex_value[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgb({r} {g} {b} / {int(alpha) / 100:g})"
+
+
+def faded(value):
+    """The fully transparent version of a colour, for gradient ends."""
+    resolved = color(value.partition("/")[0])
+    if resolved is None:
+        return None
+    return "rgb(0 0 0 / 0)" if resolved == "transparent" else color(value.partition("/")[0] + "/0")
+
+
+def length(value, extra=None):
+    """Resolve a spacing step, fraction, keyword from `extra` or arbitrary value."""
+    if extra and value in extra:
+        return extra[value]
+    if value in SPACING:
+        return SPACING[value]
+    top, slash, bottom = value.partition("/")
+    if slash and top.isdigit() and bottom.isdigit() and int(bottom):
+        return f"{int(top) / int(bottom) * 100:.6g}%"
+    return arbitrary(value)
+
+
+def negate(value):
+    return value if value.startswith("0") else f"calc({value} * -1)" if value.startswith("calc") else "-" + value
+
+
+SIZES = {"auto": "auto", "full": "100%"}
+HEIGHTS = dict(SIZES, screen="100vh")
+WIDTHS = dict(SIZES, screen="100vw")
+
+
+def keywords(table):
+    return lambda name: table.get(name)
+
+
+def prefixed(prefix, resolve, template, negative=False):
+    """Match ``<prefix>-<value>`` (and ``-<prefix>-<value>`` if `negative`)."""
+    def match(name):
+        sign = negative and name.startswith("-")
+        if sign:
+            name = name[1:]
+        if not name.startswith(prefix + "-"):
+            return None
+        value = resolve(name[len(prefix) + 1:])
+        if value is None:
+            return None
+        return template.format(negate(value) if sign else value)
+    return match
+
+
+def sided(prefix, prop, resolve, negative=False):
+    """Match ``mx-4``, ``pt-2``... for each side in SIDES."""
+    matchers = [prefixed(prefix + side, resolve, ";".join(f"{prop}-{name}:{{0}}" for name in names), negative)
+                for side, names in SIDES.items()]
+    return lambda name: next((declaration for m in matchers if (declaration := m(name))), None)
+
+
+def rounded(name):
+    if name == "rounded" or not name.startswith("rounded-"):
+        return None
+    corner, _, size = name[8:].partition("-")
+    if corner not in CORNERS or size not in RADII:
+        return None
+    return ";".join(f"border-{c}-radius:{RADII[size]}" for c in CORNERS[corner])
+
+
+def border_side(name):
+    match = re.fullmatch(r"border-([trblxy])(?:-(\d+))?", name)
+    if not match:
+        return None
+    width = f"{match[2] or 1}px"
+    return ";".join(f"border-{side}-width:{width}" for side in SIDES[match[1]])
+
+
+def background_image(name):
+    match = re.fullmatch(r"bg-gradient-to-(t|tr|r|br|b|bl|l|tl)", name)
+    if match:
+        words = {"t": "top", "r": "right", "b": "bottom", "l": "left"}
+        direction = " ".join(words[c] for c in match[1])
+        return f"background-image:linear-gradient(to {direction},var(--tw-gradient-stops))"
+    value = arbitrary(name[3:]) if name.startswith("bg-") else None
+    if value and re.match(r"(repeating-)?(linear|radial|conic)-gradient\(|url\(", value):
+        return f"background-image:{value}"
+    return None
+
+
+def gradient_from(value):
+    c, end = color(value), faded(value)
+    if c is None:
+        return None
+    return f"--tw-gradient-from:{c};--tw-gradient-to:{end};--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)"
+
+
+def gradient_via(value):
+    c, end = color(value), faded(value)
+    if c is None:
+        return None
+    return f"--tw-gradient-to:{end};--tw-gradient-stops:var(--tw-gradient-from),{c},var(--tw-gradient-to)"
+
+
+def scale(value):
+    return f"{int(value) / 100:g}" if value.isdigit() else None
+
+
+def integer(value):
+    return value if value.isdigit() else None
+
+
+# Utilities in cascade order: a later rule wins over an earlier one of the same
+# specificity, so shorthands come before the longhands that refine them.
+# Each entry is (matcher, selector suffix); a matcher returns declarations or None.
+UTILITIES = [
+    (keywords({"visible": "visibility:visible", "invisible": "visibility:hidden"}), ""),
+    (keywords({p: f"position:{p}" for p in ("static", "fixed", "absolute", "relative", "sticky")}), ""),
+    (prefixed("inset", lambda v: length(v, SIZES), "inset:{}", negative=True), ""),
+    (lambda name: next((d for side in ("top", "right", "bottom", "left")
+                        if (d := prefixed(side, lambda v: length(v, SIZES), f"{side}:{{}}", negative=True)(name))), None), ""),
+    (prefixed("z", integer, "z-index:{}"), ""),
+    (prefixed("col-span", integer, "grid-column:span {0} / span {0}"), ""),
+    (prefixed("m", lambda v: length(v, {"auto": "auto"}), "margin:{}", negative=True), ""),
+    (sided("m", "margin", lambda v: length(v, {"auto": "auto"}), negative=True), ""),
+    (prefixed("line-clamp", integer, "overflow:hidden;display:-webkit-box;-webkit-box-orient:vertical;-webkit-line-clamp:{}"), ""),
+    (keywords({"block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+               "flex": "display:flex", "inline-flex": "display:inline-flex", "grid": "display:grid",
+               "hidden": "display:none"}), ""),
+    (prefixed("h", lambda v: length(v, HEIGHTS), "height:{}"), ""),
+    (prefixed("max-h", lambda v: length(v, HEIGHTS), "max-height:{}"), ""),
+    (keywords({"min-h-screen": "min-height:100vh", "min-h-full": "min-height:100%", "min-h-0": "min-height:0px"}), ""),
+    (prefixed("w", lambda v: length(v, WIDTHS), "width:{}"), ""),
+    (prefixed("max-w", lambda v: length(v, MAX_WIDTHS), "max-width:{}"), ""),
+    (keywords({"flex-1": "flex:1 1 0%", "flex-auto": "flex:1 1 auto", "flex-none": "flex:none",
+               "flex-shrink-0": "flex-shrink:0"}), ""),
+    (prefixed("translate-x", lambda v: length(v, SIZES), "--tw-translate-x:{};transform:" + TRANSFORM, negative=True), ""),
+    (prefixed("translate-y", lambda v: length(v, SIZES), "--tw-translate-y:{};transform:" + TRANSFORM, negative=True), ""),
+    (prefixed("scale", scale, "--tw-scale-x:{0};--tw-scale-y:{0};transform:" + TRANSFORM), ""),
+    (keywords({"transform": "transform:" + TRANSFORM, "transform-none": "transform:none"}), ""),
+    (keywords({"cursor-pointer": "cursor:pointer", "cursor-default": "cursor:default"}), ""),
+    (keywords({"list-inside": "list-style-position:inside", "list-outside": "list-style-position:outside"}), ""),
+    (keywords({"list-disc": "list-style-type:disc", "list-decimal": "list-style-type:decimal",
+               "list-none": "list-style-type:none"}), ""),
+    (prefixed("grid-cols", integer, "grid-template-columns:repeat({},minmax(0,1fr))"), ""),
+    (keywords({"flex-row": "flex-direction:row", "flex-col": "flex-direction:column",
+               "flex-wrap": "flex-wrap:wrap", "flex-nowrap": "flex-wrap:nowrap"}), ""),
+    (keywords({f"items-{k}": f"align-items:{v}" for k, v in
+               {"start": "flex-start", "end": "flex-end", "center": "center", "stretch": "stretch"}.items()}), ""),
+    (keywords({f"justify-{k}": f"justify-content:{v}" for k, v in
+               {"start": "flex-start", "end": "flex-end", "center": "center",
+                "between": "space-between", "around": "space-around"}.items()}), ""),
+    (prefixed("gap", length, "gap:{}"), ""),
+    (prefixed("space-y", length, "margin-top:{}"), " > :not([hidden]) ~ :not([hidden])"),
+    (prefixed("space-x", length, "margin-left:{}"), " > :not([hidden]) ~ :not([hidden])"),
+    (keywords({f"overflow-{k}": f"overflow:{k}" for k in ("auto", "hidden", "visible", "scroll")}), ""),
+    (lambda name: f"border-radius:{RADII[name[8:]]}" if name == "rounded" or (name.startswith("rounded-") and name[8:] in RADII) else None, ""),
+    (rounded, ""),
+    (lambda name: "border-width:1px" if name == "border" else None, ""),
+    (prefixed("border", integer, "border-width:{}px"), ""),
+    (border_side, ""),
+    (prefixed("border", color, "border-color:{}"), ""),
+    (prefixed("bg", color, "background-color:{}"), ""),
+    (background_image, ""),
+    (prefixed("from", gradient_from, "{}"), ""),
+    (prefixed("via", gradient_via, "{}"), ""),
+    (prefixed("to", color, "--tw-gradient-to:{}"), ""),
+    (keywords({"bg-cover": "background-size:cover", "bg-contain": "background-size:contain"}), ""),
+    (keywords({"bg-center": "background-position:center", "bg-top": "background-position:top"}), ""),
+    (keywords({f"object-{k}": f"object-fit:{k}" for k in ("contain", "cover", "fill")}), ""),
+    (prefixed("stroke", color, "stroke:{}"), ""),
+    (prefixed("p", length, "padding:{}"), ""),
+    (sided("p", "padding", length), ""),
+    (keywords({f"text-{k}": f"text-align:{k}" for k in ("left", "center", "right", "justify")}), ""),
+    (prefixed("text", FONT_SIZES.get, "font-size:{}"), ""),
+    (keywords({"font-normal": "font-weight:400", "font-medium": "font-weight:500",
+               "font-semibold": "font-weight:600", "font-bold": "font-weight:700"}), ""),
+    (keywords({"uppercase": "text-transform:uppercase", "lowercase": "text-transform:lowercase",
+               "capitalize": "text-transform:capitalize"}), ""),
+    (keywords({"leading-none": "line-height:1", "leading-tight": "line-height:1.25",
+               "leading-normal": "line-height:1.5", "leading-relaxed": "line-height:1.625"}), ""),
+    (keywords({"tracking-tight": "letter-spacing:-.025em", "tracking-wide": "letter-spacing:.025em",
+               "tracking-wider": "letter-spacing:.05em", "tracking-widest": "letter-spacing:.1em"}), ""),
+    (prefixed("text", color, "color:{}"), ""),
+    (prefixed("opacity", scale, "opacity:{}"), ""),
+    (lambda name: f"box-shadow:{SHADOWS[name[7:]]}" if name == "shadow" or (name.startswith("shadow-") and name[7:] in SHADOWS) else None, ""),
+    (keywords({"outline-none": "outline:2px solid transparent;outline-offset:2px"}), ""),
+    (lambda name: "box-shadow:0 0 0 3px var(--tw-ring-color,rgb(59 130 246 / .5))" if name == "ring" else None, ""),
+    (prefixed("ring", integer, "box-shadow:0 0 0 {}px var(--tw-ring-color,rgb(59 130 246 / .5))"), ""),
+    (prefixed("ring", color, "--tw-ring-color:{}"), ""),
+    (keywords({"backdrop-blur-sm": "backdrop-filter:blur(4px)", "backdrop-blur": "backdrop-filter:blur(8px)",
+               "backdrop-blur-md": "backdrop-filter:blur(12px)"}), ""),
+    (lambda name: f"transition-property:{TRANSITIONS[name[11:]]};{EASE}" if name == "transition" or (name.startswith("transition-") and name[11:] in TRANSITIONS) else None, ""),
+    (prefixed("duration", integer, "transition-duration:{}ms"), ""),
+]
+
+
+def escape(name):
+    """Escape a class name for use in a CSS selector."""
+    return re.sub(r"([^\w-])", r"\\\1", name)
+
+
+def compile_class(token):
+    """Compile one candidate class to `(sort key, media query, rule)`, or None.
+
+    Variants (``md:``, ``hover:``, ``group-hover:``) may prefix the utility;
+    colons inside an arbitrary ``[...]`` value are not variant separators.
+    """
+    bracket = token.find("[")
+    head = token if bracket < 0 else token[:bracket]
+    *variants, utility = head.split(":")
+    if bracket >= 0:
+        utility += token[bracket:]
+    if not utility or len(set(variants)) != len(variants):
+        return None
+
+    breakpoint = 0
+    media = ""
+    pseudo = ""
+    group = ""
+    for variant in variants:
+        if variant in BREAKPOINTS and not media:
+            breakpoint = list(BREAKPOINTS).index(variant) + 1
+            media = f"@media (min-width:{BREAKPOINTS[variant]})"
+        elif variant in STATES:
+            pseudo += STATES[variant]
+        elif variant == "group-hover":
+            group = ".group:hover "
+        else:
+            return None
+
+    for index, (match, suffix) in enumerate(UTILITIES):
+        declarations = match(utility)
+        if declarations:
+            rule = f"{group}.{escape(token)}{pseudo}{suffix}{{{declarations}}}"
+            return (breakpoint, bool(pseudo or group), index, token), media, rule
+    return None
+
+
+def candidates(text):
+    """Every whitespace/quote-delimited word of `text` that could be a class.
+
+    Like Tailwind's own extractor this is deliberately loose: class names
+    built in scripts are found too, and words that are not utilities are
+    simply dropped when compiled.
+    """
+    return set(re.split(r"[\s\"'`<>={};\\]+", text)) - {""}
+
+
+def compile_css(tokens):
+    """Return the stylesheet for `tokens`, preflight first, media queries last."""
+    compiled = sorted(filter(None, map(compile_class, tokens)))
+    css = [PREFLIGHT]
+    for media in ["", *(f"@media (min-width:{width})" for width in BREAKPOINTS.values())]:
+        rules = [rule for _, rule_media, rule in compiled if rule_media == media]
+        if rules and media:
+            css.append(f"{media}{{{''.join(rules)}}}")
+        elif rules:
+            css.extend(rules)
+    return "\n".join(css) + "\n"
+
+
+def strip_block(content):
+    """Return `content` without its generated block, and the block's span."""
+    start = content.find(START_MARKER)
+    end = content.find(END_MARKER, start)
+    if start < 0 or end < 0:
+        return content, None
+    return content[:start] + content[end + len(END_MARKER):], (start, end + len(END_MARKER))
+
+
+def critical_tokens(content):
+    """Candidate classes needed for the first paint of a page.
+
+    That is everything in the first CRITICAL_CHARS of the body, plus the
+    classes of fixed-position elements, which show in the viewport wherever
+    they sit in the markup (a modal's ``hidden`` must apply at once).
+    """
+    body = content.find("<body")
+    tokens = candidates(content[body:body + CRITICAL_CHARS] if body >= 0 else "")
+    for classes in re.findall(r'class="([^"]*)"', content):
+        if "fixed" in classes.split():
+            tokens.update(classes.split())
+    return tokens
+
+
+def unknown_classes(content, css_text):
+    """Class attribute names that are neither utilities nor styled by the page itself."""
+    unknown = set()
+    for classes in re.findall(r'class="([^"$]*)"', content):
+        for token in classes.split():
+            if compile_class(token) is None and f".{token}" not in css_text:
+                unknown.add(token)
+    return unknown
+
+
+def render_block(css_href, critical, indent):
+    return (f"{START_MARKER}\n"
+            f"{indent}<style>{critical}</style>\n"
+            f"{indent}<link rel=\"stylesheet\" href=\"{css_href}\" media=\"print\" onload=\"this.media='all'\">\n"
+            f"{indent}<noscript><link rel=\"stylesheet\" href=\"{css_href}\"></noscript>\n"
+            f"{indent}{END_MARKER}")
+
+
+def build(pages=PAGES, css_file=CSS_FILE):
+    """Write the site stylesheet for `pages` and refresh each page's critical CSS.
+
+    Pages link the stylesheet without a ``?v=`` cache buster: it would
+    change on every page whenever any one page gains a class, so a page is
+    only rewritten when its own critical CSS changes. Deployed pages get a
+    content-hashed stylesheet name from build_dist.py instead.
+
+    Returns `(rule count, pages rewritten, {page: unknown classes})`.
+    """
+    contents = {}
+    for page in pages:
+        with open(page, "r", encoding="utf-8") as f:
+            contents[page] = f.read()
+        if strip_block(contents[page])[1] is None:
+            raise ValueError(f"{page} has no generated stylesheet block")
+
+    stripped = {page: strip_block(content)[0] for page, content in contents.items()}
+    tokens = set().union(*map(candidates, stripped.values()))
+    css = compile_css(tokens)
+    os.makedirs(os.path.dirname(css_file) or ".", exist_ok=True)
+    write_if_changed(css_file, css)
+
+    rewritten = 0
+    unknown = {}
+    for page, content in contents.items():
+        _, (start, end) = strip_block(content)
+        critical = compile_css(critical_tokens(stripped[page]) & tokens).replace("\n", "")
+        indent = content[content.rfind("\n", 0, start) + 1:start]
+        updated = content[:start] + render_block(css_file, critical, indent) + content[end:]
+        rewritten += write_if_changed(page, updated)
+        unknown[page] = unknown_classes(stripped[page], css + stripped[page])
+    return css.count("{") - css.count("@media"), rewritten, unknown
+
+
+def main(verbose=False):
+    rules, rewritten, unknown = build()
+    print(f"Wrote {CSS_FILE}: {rules} rules for {len(PAGES)} pages")
+    print("=" * 50)
+    for page, names in unknown.items():
+        if names:
+            print(f"{page}: {len(names)} unstyled class(es)" + (f": {' '.join(sorted(names))}" if verbose else ""))
+    print(f"Pages updated: {rewritten}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the Tailwind classes the pages use into a static stylesheet")
+    parser.add_argument("--verbose", action="store_true",
+                        help="list class names that no utility or page style matches")
+    args = parser.parse_args()
+    main(verbose=args.verbose)
@@ -0,0 +1,204 @@
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from build_css import PAGES
+from generate_gallery import DATA_FOLDER, write_if_changed
+from minify import minify_css, minify_html, minify_js
+
+try:
+    import brotli
+except ImportError:  # Only .gz variants are written without it
+    brotli = None
+
+# Configuration
+DIST_FOLDER = "dist"
+MANIFEST_FILE = f"{DIST_FOLDER}/asset-manifest.json"
+ASSETS_FOLDER = "assets"   # Files here are minified and renamed after their content
+HASH_LENGTH = 10
+# Served as they are, hard-linked into the output where the filesystem allows
+STATIC_FOLDERS = ["images", "thumbs", "Sandales", "Bags", "boutique-data"]
+STATIC_PATTERNS = ["*.jpg", "*.jpeg", "*.png", "*.webp", "*.svg", "*.ico"]
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+MIN_COMPRESS_SIZE = 1024   # Smaller files gain nothing from a compressed sibling
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+MINIFIERS = {".css": minify_css, ".js": minify_js, ".html": minify_html}
+# Folders renamed after their content, and what each file type goes through on the way
+HASHED_FOLDERS = {
+    ASSETS_FOLDER: MINIFIERS,
+    DATA_FOLDER: {".json": lambda text: text},   # Feed chunks and search index, already compact
+}
+
+
+def hashed_name(path, data):
+    """``assets/site.css`` -> ``assets/site.<hash>.css`` for content `data`."""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(data.encode('utf-8')).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def build_assets(dist=DIST_FOLDER):
+    """Write every file in HASHED_FOLDERS into `dist` under a content-hashed name.
+
+    Assets are minified on the way; the gallery's feed chunks and search
+    index are copied as they are. Returns the manifest mapping each source
+    path to its hashed path.
+    """
+    manifest = {}
+    for folder, minifiers in HASHED_FOLDERS.items():
+        for path in sorted(glob.glob(f"{folder}/**/*", recursive=True)):
+            if not os.path.isfile(path):
+                continue
+            path = path.replace(os.sep, "/")
+            ext = os.path.splitext(path)[1]
+            if ext not in minifiers:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = minifiers[ext](f.read())
+            target = hashed_name(path, data)
+            os.makedirs(os.path.dirname(os.path.join(dist, target)), exist_ok=True)
+            write_if_changed(os.path.join(dist, target), data)
+            manifest[path] = target
+    return manifest
+
+
+def rewrite_references(html, manifest):
+    """Point a page at the hashed assets and feed files, dropping ``?v=`` cache busters.
+
+    Feed paths inside the page's inline feed JSON are plain strings, so
+    they are rewritten the same way.
+    """
+    for source, target in manifest.items():
+        html = re.sub(re.escape(source) + r"(\?v=[\w.-]*)?", target, html)
+    return html
+
+
+def build_pages(manifest, pages=PAGES, dist=DIST_FOLDER):
+    """Write each page into `dist`, minified and linked to the hashed assets."""
+    for page in pages:
+        with open(page, "r", encoding="utf-8") as f:
+            html = f.read()
+        write_if_changed(os.path.join(dist, page), minify_html(rewrite_references(html, manifest)))
+    return list(pages)
+
+
+def is_same_file(source, target):
+    if not os.path.exists(target):
+        return False
+    a, b = os.stat(source), os.stat(target)
+    return a.st_ino == b.st_ino or (a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns)
+
+
+def link_static(dist=DIST_FOLDER):
+    """Hard-link (or copy) the static files into `dist`; returns their paths."""
+    sources = [path for pattern in STATIC_PATTERNS for path in glob.glob(pattern)]
+    for folder in STATIC_FOLDERS:
+        sources.extend(path for path in glob.glob(f"{folder}/**/*", recursive=True) if os.path.isfile(path))
+
+    paths = []
+    for source in sorted(set(sources)):
+        source = source.replace(os.sep, "/")
+        target = os.path.join(dist, source)
+        paths.append(source)
+        if is_same_file(source, target):
+            continue
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+    return paths
+
+
+def compress(path):
+    """Write `.gz` (and `.br`, with brotli) siblings of `path` if stale.
+
+    Returns the compressed sizes by extension.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    variants = {".gz": lambda: gzip.compress(data, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = lambda: brotli.compress(data, quality=BROTLI_QUALITY)
+
+    sizes = {}
+    mtime = os.stat(path).st_mtime_ns
+    for ext, encode in variants.items():
+        target = path + ext
+        if not os.path.exists(target) or os.stat(target).st_mtime_ns < mtime:
+            tmp_file = target + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(encode())
+            os.replace(tmp_file, target)
+        sizes[ext] = os.path.getsize(target)
+    return sizes
+
+
+def prune(keep, dist=DIST_FOLDER):
+    """Delete files in `dist` left by earlier builds (old hashed assets...)."""
+    keep = {os.path.normpath(os.path.join(dist, path)) for path in keep}
+    removed = 0
+    for root, _, files in os.walk(dist):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            base = re.sub(r"\.(gz|br)$", "", path)
+            if path not in keep and base not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def build(dist=DIST_FOLDER):
+    """Build the deployable site into `dist`; returns `(manifest, files, removed)`."""
+    os.makedirs(dist, exist_ok=True)
+    manifest = build_assets(dist)
+    files = build_pages(manifest, dist=dist) + list(manifest.values()) + link_static(dist)
+    write_if_changed(MANIFEST_FILE, json.dumps(manifest, indent=1, sort_keys=True))
+    files.append(os.path.relpath(MANIFEST_FILE, dist))
+
+    for path in files:
+        full_path = os.path.join(dist, path)
+        if path.endswith(COMPRESSIBLE) and os.path.getsize(full_path) >= MIN_COMPRESS_SIZE:
+            compress(full_path)
+    return manifest, files, prune(files, dist)
+
+
+def transfer_sizes(page, dist=DIST_FOLDER):
+    """Return `(source, minified, gzip, brotli)` byte sizes of one page."""
+    built = os.path.join(dist, page)
+    sizes = [os.path.getsize(page), os.path.getsize(built)]
+    for ext in (".gz", ".br"):
+        sizes.append(os.path.getsize(built + ext) if os.path.exists(built + ext) else None)
+    return sizes
+
+
+def main():
+    if brotli is None:
+        print("brotli is not installed, writing .gz variants only: pip install brotli")
+    manifest, files, removed = build()
+    print(f"Built {len(files)} files into {DIST_FOLDER}/")
+    print("=" * 50)
+    for source, target in manifest.items():
+        print(f"{source} -> {target}")
+    for page in PAGES:
+        source, minified, gz, br = transfer_sizes(page)
+        best = br or gz or minified
+        print(f"{page}: {source:,} -> {minified:,} minified, {gz:,} gzip"
+              + (f", {br:,} brotli" if br else "") + f" ({100 - best * 100 // source}% smaller)")
+    print("=" * 50)
+    print(f"Stale files removed: {removed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Minify the site into {DIST_FOLDER}/ with content-hashed assets and precompressed variants")
+    parser.parse_args()
+    main()
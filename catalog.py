@@ -0,0 +1,286 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+
+from categories import classify
+
+# Configuration
+CATALOG_FILE = "catalog.db"
+CSV_FILE = "products.csv"
+CSV_FIELDS = ["title", "image", "handle"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    key        TEXT PRIMARY KEY,
+    position   INTEGER NOT NULL,
+    title      TEXT NOT NULL,
+    image      TEXT NOT NULL DEFAULT '',
+    handle     TEXT,
+    category   TEXT NOT NULL,
+    image_hash TEXT,
+    seq        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_position ON products (position);
+CREATE INDEX IF NOT EXISTS products_category ON products (category, position);
+CREATE INDEX IF NOT EXISTS products_image_hash ON products (image_hash, position);
+CREATE INDEX IF NOT EXISTS products_seq ON products (seq);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    key    TEXT NOT NULL,
+    action TEXT NOT NULL,
+    time   REAL NOT NULL
+);
+"""
+# Columns compared to decide whether an upsert changed a product
+TRACKED = ("position", "title", "image", "handle")
+
+
+def product_key(product, position):
+    """Catalog key of a product: its handle, else its CSV row (``"0001"``).
+
+    Rows without a handle (CSVs scraped before handles were recorded) have
+    no identity beyond their place in the file, so they are keyed by it,
+    like the image store's product keys.
+    """
+    return product.get("handle") or f"{position:04d}"
+
+
+def file_stamp(path):
+    """Size and modification time of a file, to tell whether it changed since it was read."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class Catalog:
+    """SQLite product catalog with an append-only change log.
+
+    Every insert, update or delete of a product is numbered in the
+    `changes` table and the product row keeps the number of its latest
+    change, so "what changed since change N" is an indexed range query.
+    Products keep their CSV order in `position`, which also gives the row
+    number used as the image store's product key.
+    """
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # Change numbers restart in a recreated catalog; this tells two catalogs apart
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('created', ?)",
+                              (repr(time.time()),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _log(self, key, action, now):
+        cursor = self.conn.execute(
+            "INSERT INTO changes (key, action, time) VALUES (?, ?, ?)", (key, action, now))
+        return cursor.lastrowid
+
+    def _existing(self):
+        rows = self.conn.execute(f"SELECT key, {', '.join(TRACKED)} FROM products")
+        return {row["key"]: tuple(row[column] for column in TRACKED) for row in rows}
+
+    def upsert(self, products, positions=None):
+        """Insert new products and update changed ones; returns the change count.
+
+        `positions` gives each product's place in the CSV order; without it,
+        known products keep theirs and new ones are appended. A product
+        without a handle is keyed by its position, so it needs one: without
+        `positions` it raises ValueError instead of being appended again on
+        every call.
+        """
+        products = list(products)
+        if positions is None:
+            missing = [product["title"] for product in products if not product.get("handle")]
+            if missing:
+                raise ValueError(f"{len(missing)} product(s) have no handle and need positions (first: {missing[0]!r})")
+        now = time.time()
+        changed = 0
+        with self.conn:
+            existing = self._existing()
+            end = max((values[0] for values in existing.values()), default=0)
+            for n, product in enumerate(products):
+                if positions is not None:
+                    position = positions[n]
+                else:
+                    key = product["handle"]
+                    position = existing[key][0] if key in existing else end + 1
+                key = product_key(product, position)
+                values = (position, product["title"], product.get("image") or "", product.get("handle") or None)
+                if existing.get(key) == values:
+                    continue
+                action = "update" if key in existing else "insert"
+                seq = self._log(key, action, now)
+                self.conn.execute(
+                    "INSERT INTO products (key, position, title, image, handle, category, seq)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET position = excluded.position,"
+                    " title = excluded.title, image = excluded.image, handle = excluded.handle,"
+                    " category = excluded.category, seq = excluded.seq,"
+                    " image_hash = CASE WHEN image = excluded.image THEN image_hash END",
+                    (key, *values, classify(product["title"])[0], seq))
+                existing[key] = values
+                end = max(end, position)
+                changed += 1
+        return changed
+
+    def sync(self, products):
+        """Make the catalog hold exactly `products`, in order.
+
+        Returns `(changed, removed)`; unchanged products are left untouched
+        and keep their change numbers.
+        """
+        products = list(products)
+        changed = self.upsert(products, positions=range(1, len(products) + 1))
+        return changed, self.prune(product_key(product, n) for n, product in enumerate(products, 1))
+
+    def prune(self, keys):
+        """Delete the products whose key is not in `keys`; returns how many were removed."""
+        keep = set(keys)
+        now = time.time()
+        with self.conn:
+            stale = [key for key in self._existing() if key not in keep]
+            for key in stale:
+                self._log(key, "delete", now)
+            self.conn.executemany("DELETE FROM products WHERE key = ?", [(key,) for key in stale])
+        return len(stale)
+
+    def set_image_hashes(self, hashes):
+        """Record the stored image hash of products, given as `{key: hash}`."""
+        now = time.time()
+        with self.conn:
+            for key, image_hash in hashes.items():
+                row = self.conn.execute(
+                    "SELECT image_hash FROM products WHERE key = ?", (key,)).fetchone()
+                if row is None or row["image_hash"] == image_hash:
+                    continue
+                seq = self._log(key, "image", now)
+                self.conn.execute(
+                    "UPDATE products SET image_hash = ?, seq = ? WHERE key = ?", (image_hash, seq, key))
+
+    def _query(self, where="", params=(), order="position"):
+        rows = self.conn.execute(
+            f"SELECT key, title, image, handle, category, image_hash FROM products {where} ORDER BY {order}",
+            params)
+        return [dict(row, handle=row["handle"] or "") for row in rows]
+
+    def products(self):
+        """Return every product, in CSV order."""
+        return self._query()
+
+    def by_category(self, category):
+        """Return the products whose primary category is `category`."""
+        return self._query("WHERE category = ?", (category,))
+
+    def by_image_hash(self, image_hash):
+        """Return the products sharing one stored image."""
+        return self._query("WHERE image_hash = ?", (image_hash,))
+
+    def changed_since(self, seq):
+        """Return products inserted or modified after change number `seq`, oldest change first."""
+        return self._query("WHERE seq > ?", (seq or 0,), order="seq")
+
+    def changes_since(self, seq):
+        """Return the change log entries after change number `seq`."""
+        rows = self.conn.execute(
+            "SELECT seq, key, action, time FROM changes WHERE seq > ? ORDER BY seq", (seq or 0,))
+        return [dict(row) for row in rows]
+
+    def created(self):
+        """Return when this catalog file was created, to tell it from one recreated in its place."""
+        return self._get_meta("created")
+
+    def last_change(self):
+        """Return the number of the latest change, 0 for an empty catalog."""
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def _set_meta(self, name, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (name, value) VALUES (?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value))
+
+    def _get_meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row["value"] if row else None
+
+    def in_sync_with(self, csv_file=CSV_FILE):
+        """True if `csv_file` is unchanged since the catalog last imported or exported it."""
+        return self._get_meta("csv") == file_stamp(csv_file)
+
+    def import_csv(self, csv_file=CSV_FILE):
+        """Sync the catalog with a products CSV; returns `(changed, removed)`."""
+        stamp = file_stamp(csv_file)   # Taken first: an edit made while reading is picked up next time
+        with open(csv_file, "r", encoding="utf-8") as f:
+            result = self.sync(csv.DictReader(f))
+        self._set_meta("csv", stamp)
+        return result
+
+    def export_csv(self, csv_file=CSV_FILE):
+        """Write the catalog as a products CSV, atomically; returns the row count."""
+        products = self.products()
+        tmp_file = csv_file + ".tmp"
+        with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(products)
+        os.replace(tmp_file, csv_file)
+        self._set_meta("csv", file_stamp(csv_file))
+        return len(products)
+
+
+def load_products(csv_file=CSV_FILE, catalog_file=CATALOG_FILE):
+    """Return the product list, from the catalog when there is one.
+
+    A CSV edited or rescraped since the catalog last imported or exported
+    it is imported first. Without a catalog, the CSV is read directly.
+    """
+    if not os.path.exists(catalog_file):
+        with open(csv_file, "r", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    with Catalog(catalog_file) as catalog:
+        if os.path.exists(csv_file) and not catalog.in_sync_with(csv_file):
+            changed, removed = catalog.import_csv(csv_file)
+            print(f"Imported {csv_file} into {catalog_file} ({changed} changed, {removed} removed)")
+        return catalog.products()
+
+
+def main(command, since=0):
+    with Catalog() as catalog:
+        if command == "import":
+            changed, removed = catalog.import_csv()
+            print(f"Imported {CSV_FILE}: {changed} changed, {removed} removed")
+        elif command == "export":
+            print(f"Exported {catalog.export_csv()} products to {CSV_FILE}")
+        else:
+            entries = catalog.changes_since(since)
+            for entry in entries:
+                print(f"{entry['seq']:>6}  {entry['action']:<7} {entry['key']}")
+            print(f"{len(entries)} change(s) since #{since} (latest: #{catalog.last_change()})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the SQLite product catalog")
+    parser.add_argument("command", choices=["import", "export", "changes"],
+                        help=f"import {CSV_FILE}, export it back, or list changes")
+    parser.add_argument("--since", type=int, default=0,
+                        help="with 'changes', list only changes after this number")
+    args = parser.parse_args()
+    main(args.command, since=args.since)
@@ -0,0 +1,111 @@
+import bisect
+import itertools
+import re
+from collections import Counter
+
+# Configuration
+CSV_FILE = "products.csv"
+
+# Category rules, in priority order: the first matching category is a
+# product's primary label. Keywords match anywhere in the lowercased title.
+CATEGORY_RULES = [
+    ("wig", ["wig"]),
+    ("closure", ["closure"]),
+    ("frontal", ["frontal"]),
+    ("straight", ["straight"]),
+    ("wave", ["wave", "wavy"]),
+    ("curly", ["curly", "curl"]),
+    ("bundle", ["bundle"]),
+    ("bag", ["bag"]),
+    ("sandales", ["sandal"]),
+]
+DEFAULT_CATEGORY = "bundle"
+
+
+class Classifier:
+    """Multi-label title classifier compiled from a rule table.
+
+    All keywords are joined into one regex alternation inside a lookahead,
+    which matches at every position without consuming text, so overlapping
+    keywords ("body wave" and "wave") are all found. A keyword listed by
+    several rules gives every one of their categories. Results are cached
+    per title.
+    """
+
+    def __init__(self, rules=CATEGORY_RULES, default=DEFAULT_CATEGORY):
+        self.categories = [category for category, _ in rules]
+        self.default = default
+        self.cache = {}
+
+        keyword_categories = {}
+        for n, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword.lower(), set()).add(n)
+        # Only the longest keyword starting at a position is reported, and it
+        # implies every keyword that is a prefix of it ("curly" -> "curl")
+        self.implied = {
+            keyword: frozenset().union(*(found for other, found in keyword_categories.items()
+                                         if keyword.startswith(other)))
+            for keyword in keyword_categories
+        }
+        keywords = sorted(keyword_categories, key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+
+    def _labels(self, found):
+        return tuple(self.categories[n] for n in sorted(found)) or (self.default,)
+
+    def classify(self, title):
+        """Return every category of `title`, in rule priority order."""
+        labels = self.cache.get(title)
+        if labels is None:
+            found = set()
+            for match in self.pattern.finditer(title.lower()):
+                found |= self.implied[match[1]]
+            labels = self.cache[title] = self._labels(found)
+        return labels
+
+    def classify_all(self, titles):
+        """Classify many titles with one scan of their joined text; returns a list of label tuples."""
+        titles = list(titles)
+        pending = [title for title in dict.fromkeys(titles) if title not in self.cache]
+        if pending:
+            lowered = [title.lower() for title in pending]
+            # Offset just past each title; keywords never span the newline between two
+            ends = list(itertools.accumulate(len(title) + 1 for title in lowered))
+            found = [set() for _ in pending]
+            for match in self.pattern.finditer("\n".join(lowered)):
+                found[bisect.bisect_right(ends, match.start())] |= self.implied[match[1]]
+            for title, categories in zip(pending, found):
+                self.cache[title] = self._labels(categories)
+        return [self.cache[title] for title in titles]
+
+
+_default = Classifier()
+classify = _default.classify
+classify_all = _default.classify_all
+
+
+def get_category(title):
+    """Determine the primary category from product title."""
+    return classify(title)[0]
+
+
+def main():
+    from catalog import load_products  # catalog imports this module
+    titles = [product['title'] for product in load_products(CSV_FILE)]
+
+    primary = Counter()
+    labels = Counter()
+    for categories in classify_all(titles):
+        primary[categories[0]] += 1
+        labels.update(categories)
+
+    print(f"Classified {len(titles)} products from {CSV_FILE}")
+    print("=" * 50)
+    for category in dict.fromkeys(_default.categories + [DEFAULT_CATEGORY]):
+        if labels[category]:
+            print(f"{category:<10} {primary[category]:>5} primary  {labels[category]:>5} tagged")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,95 @@
-import csv
+import argparse
 import os
-import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from catalog import CATALOG_FILE, Catalog, load_products, product_key
+from http_cache import HttpCache
+from image_store import EXTENSIONS, ImageStore, canonical_url, image_format
+
 # Configuration
 CSV_FILE = "products.csv"
 OUTPUT_FOLDER = "images"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 }
+MAX_WORKERS = 8        # Concurrent downloads
+RATE_LIMIT = 5.0       # Requests per second, per host
+RATE_BURST = 5         # Requests allowed back to back before throttling
+# Content types some CDNs send for any file; the magic bytes decide whether it is an image
+GENERIC_TYPES = {"application/octet-stream", "binary/octet-stream"}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"rate must be positive and capacity at least 1 (got {rate}, {capacity})")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host, so each CDN is throttled independently."""
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to the host of `url` is allowed."""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def positive(kind):
+    """An argparse type converting with `kind` and rejecting values <= 0."""
+    def convert(value):
+        number = kind(value)
+        if number <= 0:
+            raise argparse.ArgumentTypeError(f"must be greater than 0: {value}")
+        return number
+    convert.__name__ = kind.__name__   # argparse names the type in its error messages
+    return convert
+
+
+def create_session(pool_size=MAX_WORKERS):
+    """Create a requests session whose keep-alive pool fits every worker."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def sanitize_filename(title):
@@ -35,77 +115,205 @@ def get_extension(url):
     return ".jpg"  # Default
 
 
-def download_image(url, filepath):
-    """Download an image from URL to filepath."""
+def download_image(url, filepath, session=None, limiter=None, headers=None):
+    """Download an image from URL to filepath.
+
+    Returns the (closed) response on success, or None on failure. A 304 Not
+    Modified reply to conditional `headers` counts as success and leaves
+    `filepath` untouched. A reply that is not an image (an HTML error page
+    served with 200, say) is a failure: its magic bytes are checked, and so
+    is its Content-Type unless it is missing or generic.
+    """
+    if limiter:
+        with metrics.span("http.throttle"):
+            limiter.wait(url)
+    # Write to a temporary file so an interrupted download never looks finished
+    tmp_path = filepath + ".part"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30, stream=True)
-        response.raise_for_status()
+        with metrics.span("http.request"):
+            response = (session or requests).get(
+                url, headers={**HEADERS, **(headers or {})}, timeout=30, stream=True
+            )
+            metrics.count(f"http.status.{response.status_code}")
+            response.raise_for_status()
+            if response.status_code == 304:
+                response.close()
+                return response
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and not content_type.startswith("image/") and content_type not in GENERIC_TYPES:
+                response.close()
+                raise ValueError(f"not an image ({content_type})")
 
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        return True
+            size = 0
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    size += len(chunk)
+        metrics.count("bytes.downloaded", size)
+        if image_format(tmp_path) is None:
+            raise ValueError("not an image (unrecognised content)")
+        os.replace(tmp_path, filepath)
+        return response
     except Exception as e:
+        metrics.count(f"http.errors.{type(e).__name__}")
         print(f"  Error: {e}")
-        return False
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
 
+def fetch_into_store(store, url, ext, session=None, limiter=None, cache=None):
+    """Download `url` into the image store.
 
-def main():
+    With an HTTP cache, a URL fetched before is revalidated with a
+    conditional request. Returns `(blob, changed)`; `blob` is None on failure
+    and `changed` is False when the server answered 304 Not Modified.
+    """
+    conditional = cache.conditional_headers(url) if cache else {}
+    tmp_path = store.temp_path()
+    response = download_image(url, tmp_path, session, limiter, headers=conditional)
+    if response is None or response.status_code == 304:
+        os.remove(tmp_path)
+        if response is None:
+            return None, False
+        return cache.get(url)["blob"], False
+
+    # Store it under the extension of what actually arrived, not the one the URL suggests
+    blob = store.add_file(tmp_path, url, EXTENSIONS.get(image_format(tmp_path), ext))
+    if cache:
+        cache.update(url, response.headers, blob)
+    return blob, True
+
+
+def main(workers=MAX_WORKERS, rate=RATE_LIMIT, burst=RATE_BURST, refresh=False, profile=()):
+    run = metrics.start("download_images", profile)
     # Create output folder
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER)
         print(f"Created folder: {OUTPUT_FOLDER}")
 
-    # Read CSV
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        products = list(reader)
+    products = load_products(CSV_FILE)
 
-    print(f"Found {len(products)} products to download")
+    total = len(products)
+    print(f"Found {total} products to download ({workers} workers, {rate:g} req/s per host)")
     print("=" * 50)
 
     downloaded = 0
+    unchanged = 0
     skipped = 0
     failed = 0
 
-    for i, product in enumerate(products, 1):
-        title = product.get('title', f'product_{i}')
-        image_url = product.get('image', '')
+    with metrics.stage("plan"):
+        store = ImageStore()
+        cache = HttpCache()
+        # One job per canonical image URL; every product row sharing it is linked afterwards
+        jobs = {}
+        for i, product in enumerate(products, 1):
+            key = product_key(product, i)
+            title = product.get('title', f'product_{i}')
+            image_url = product.get('image', '')
+
+            if not image_url or image_url == 'N/A':
+                print(f"[{i}/{total}] {title[:40]}... - SKIPPED (no image)")
+                skipped += 1
+                continue
+
+            # Adopt a file saved under the old row-numbered naming scheme, if it is an image
+            safe_title = sanitize_filename(title)
+            ext = get_extension(image_url)
+            legacy_path = os.path.join(OUTPUT_FOLDER, f"{i:04d}_{safe_title}{ext}")
+            if os.path.exists(legacy_path):
+                fmt = image_format(legacy_path)
+                if fmt is not None:
+                    store.link_product(key, store.add_file(legacy_path, image_url, EXTENSIONS[fmt]))
+                    print(f"[{i}/{total}] {title[:40]}... - EXISTS")
+                    downloaded += 1
+                    continue
+                print(f"[{i}/{total}] {title[:40]}... - {legacy_path} is not an image, fetching again")
+
+            # Skip if already in the store, unless refreshing (then revalidate it)
+            blob = store.lookup(image_url)
+            if blob and not refresh:
+                store.link_product(key, blob)
+                print(f"[{i}/{total}] {title[:40]}... - EXISTS")
+                downloaded += 1
+                continue
 
-        if not image_url or image_url == 'N/A':
-            print(f"[{i}/{len(products)}] {title[:40]}... - SKIPPED (no image)")
-            skipped += 1
-            continue
+            job = jobs.setdefault(canonical_url(image_url), {"url": image_url, "ext": ext, "rows": []})
+            job["rows"].append((i, key, title))
 
-        # Create filename
-        safe_title = sanitize_filename(title)
-        ext = get_extension(image_url)
-        filename = f"{i:04d}_{safe_title}{ext}"
-        filepath = os.path.join(OUTPUT_FOLDER, filename)
+    duplicates = sum(len(job["rows"]) - 1 for job in jobs.values())
+    if duplicates:
+        print(f"{len(jobs)} unique images to fetch ({duplicates} duplicate rows share them)")
 
-        # Skip if already downloaded
-        if os.path.exists(filepath):
-            print(f"[{i}/{len(products)}] {title[:40]}... - EXISTS")
-            downloaded += 1
-            continue
+    session = create_session(workers)
+    limiter = HostRateLimiter(rate=rate, burst=burst)
+    start = time.monotonic()
 
-        print(f"[{i}/{len(products)}] {title[:40]}...", end=" ")
+    with metrics.stage("download"):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(fetch_into_store, store, job["url"], job["ext"], session, limiter, cache): job
+                for job in jobs.values()
+            }
+            for future in as_completed(futures):
+                rows = futures[future]["rows"]
+                blob, changed = future.result()
+                for i, key, title in rows:
+                    if blob and not changed:
+                        store.link_product(key, blob)
+                        print(f"[{i}/{total}] {title[:40]}... NOT MODIFIED")
+                        unchanged += 1
+                    elif blob:
+                        store.link_product(key, blob)
+                        print(f"[{i}/{total}] {title[:40]}... OK")
+                        downloaded += 1
+                    else:
+                        print(f"[{i}/{total}] {title[:40]}... FAILED")
+                        failed += 1
 
-        if download_image(image_url, filepath):
-            print("OK")
-            downloaded += 1
-        else:
-            failed += 1
+    session.close()
+    with metrics.stage("save"):
+        keys = [product_key(product, i) for i, product in enumerate(products, 1)]
+        store.retain_products(keys)
+        store.save()
+        cache.save()
 
-        # Small delay to be polite
-        time.sleep(0.2)
+        # Record which stored image each catalog product now points at
+        if os.path.exists(CATALOG_FILE):
+            hashes = {}
+            for key in keys:
+                blob = store.product_image(key)
+                if blob:
+                    hashes[key] = os.path.splitext(os.path.basename(blob))[0]
+            with Catalog() as catalog:
+                catalog.set_image_hashes(hashes)
 
     print("=" * 50)
     print(f"Downloaded: {downloaded}")
+    if refresh:
+        print(f"Not modified: {unchanged}")
     print(f"Skipped: {skipped}")
     print(f"Failed: {failed}")
+    print(f"Time: {time.monotonic() - start:.1f}s")
     print(f"Images saved to: {OUTPUT_FOLDER}/")
+    for name, value in (("downloaded", downloaded), ("unchanged", unchanged), ("skipped", skipped), ("failed", failed)):
+        metrics.count(f"images.{name}", value)
+    print(run.report())
+    print(f"Metrics saved to: {run.save()}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Download product images listed in products.csv")
+    parser.add_argument("--workers", type=positive(int), default=MAX_WORKERS,
+                        help="number of concurrent downloads (1 = sequential)")
+    parser.add_argument("--rate", type=positive(float), default=RATE_LIMIT,
+                        help="maximum requests per second to any single host")
+    parser.add_argument("--burst", type=positive(int), default=RATE_BURST,
+                        help="requests allowed back to back to one host before throttling")
+    parser.add_argument("--refresh", action="store_true",
+                        help="revalidate stored images with conditional requests")
+    parser.add_argument("--profile", metavar="STAGES", type=metrics.parse_profile, default=set(),
+                        help="run these comma-separated stages (plan, download, save or all) under cProfile")
+    args = parser.parse_args()
+    main(workers=args.workers, rate=args.rate, burst=args.burst, refresh=args.refresh, profile=args.profile)
@@ -1,549 +1,446 @@
-import csv
+import argparse
+import hashlib
+import itertools
+import json
 import os
+import re
+
+import categories
+import metrics
+import templates
+from catalog import CATALOG_FILE, Catalog, load_products, product_key
+from categories import classify
+from image_store import STORE_FOLDER, ImageStore, build_image_index
+from thumbnails import SIZES, load_manifest, srcsets
 
 # Configuration
 CSV_FILE = "products.csv"
 IMAGES_FOLDER = "images"
 OUTPUT_FILE = "gallery.html"
+CACHE_FILE = ".gallery_cache.json"
+DATA_FOLDER = "gallery-data"  # JSON product chunks, next to OUTPUT_FILE
+FIRST_PAGE_SIZE = 40          # Cards rendered into the HTML itself
+CHUNK_SIZE = 100              # Products per JSON chunk fetched on scroll
+SEARCH_INDEX_FILE = f"{DATA_FOLDER}/search.json"
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/400x400?text=No+Image"
+BROKEN_IMAGE = "https://via.placeholder.com/400x400?text=Image+Not+Found"   # Shown if an image fails to load
+# Social icons: each page defines them once as <symbol>s and draws them with <use>
+SOCIAL_ICONS = {
+    "facebook": "M24 12.073c0-6.627-5.373-12-12-12s-12 5.373-12 12c0 5.99 4.388 10.954 10.125 11.854v-8.385H7.078v-3.47h3.047V9.43c0-3.007 1.792-4.669 4.533-4.669 1.312 0 2.686.235 2.686.235v2.953H15.83c-1.491 0-1.956.925-1.956 1.874v2.25h3.328l-.532 3.47h-2.796v8.385C19.612 23.027 24 18.062 24 12.073z",
+    "instagram": "M12 2.163c3.204 0 3.584.012 4.85.07 3.252.148 4.771 1.691 4.919 4.919.058 1.265.069 1.645.069 4.849 0 3.205-.012 3.584-.069 4.849-.149 3.225-1.664 4.771-4.919 4.919-1.266.058-1.644.07-4.85.07-3.204 0-3.584-.012-4.849-.07-3.26-.149-4.771-1.699-4.919-4.92-.058-1.265-.07-1.644-.07-4.849 0-3.204.013-3.583.07-4.849.149-3.227 1.664-4.771 4.919-4.919 1.266-.057 1.645-.069 4.849-.069zm0-2.163c-3.259 0-3.667.014-4.947.072-4.358.2-6.78 2.618-6.98 6.98-.059 1.281-.073 1.689-.073 4.948 0 3.259.014 3.668.072 4.948.2 4.358 2.618 6.78 6.98 6.98 1.281.058 1.689.072 4.948.072 3.259 0 3.668-.014 4.948-.072 4.354-.2 6.782-2.618 6.979-6.98.059-1.28.073-1.689.073-4.948 0-3.259-.014-3.667-.072-4.947-.196-4.354-2.617-6.78-6.979-6.98-1.281-.059-1.69-.073-4.949-.073zm0 5.838c-3.403 0-6.162 2.759-6.162 6.162s2.759 6.163 6.162 6.163 6.162-2.759 6.162-6.163c0-3.403-2.759-6.162-6.162-6.162zm0 10.162c-2.209 0-4-1.79-4-4 0-2.209 1.791-4 4-4s4 1.791 4 4c0 2.21-1.791 4-4 4zm6.406-11.845c-.796 0-1.441.645-1.441 1.44s.645 1.44 1.441 1.44c.795 0 1.439-.645 1.439-1.44s-.644-1.44-1.439-1.44z",
+    "tiktok": "M19.59 6.69a4.83 4.83 0 0 1-3.77-4.25V2h-3.45v13.67a2.89 2.89 0 0 1-5.2 1.74 2.89 2.89 0 0 1 2.31-4.64 2.93 2.93 0 0 1 .88.13V9.4a6.84 6.84 0 0 0-1-.05A6.33 6.33 0 0 0 5 20.1a6.34 6.34 0 0 0 10.86-4.43v-7a8.16 8.16 0 0 0 4.77 1.52v-3.4a4.85 4.85 0 0 1-1-.1z",
+}
+# Parts of the page that --hide can leave out when rendering
+CARD_FIELDS = ("price", "badge", "quickview", "details")
+PAGE_SECTIONS = ("hero", "cta", "footer")
 
 
-def get_category(title):
-    """Determine category from product title."""
-    title_lower = title.lower()
-    if 'wig' in title_lower:
-        return 'wig'
-    elif 'closure' in title_lower:
-        return 'closure'
-    elif 'frontal' in title_lower:
-        return 'frontal'
-    elif 'straight' in title_lower:
-        return 'straight'
-    elif 'wave' in title_lower or 'wavy' in title_lower:
-        return 'wave'
-    elif 'curly' in title_lower or 'curl' in title_lower:
-        return 'curly'
-    else:
-        return 'bundle'
+def find_image(i, product, store, index):
+    """Return the image path for `product`, row `i` of the catalog."""
+    # Prefer the deduplicated content-addressed store
+    return store.product_image(product_key(product, i)) or index.get(f"{i:04d}") or PLACEHOLDER_IMAGE
 
 
-def generate_html(products):
-    """Generate the gallery HTML."""
+def resolve_images(products):
+    """Return the image path of every product, resolved in one pass."""
+    store = ImageStore()
+    index = build_image_index(IMAGES_FOLDER)
+    return [find_image(i, product, store, index) for i, product in enumerate(products, 1)]
 
-    # Generate product cards
-    product_cards = []
-    for i, product in enumerate(products, 1):
-        title = product['title']
-        category = get_category(title)
-
-        # Find matching image file
-        image_files = [f for f in os.listdir(IMAGES_FOLDER) if f.startswith(f"{i:04d}_")]
-        if image_files:
-            image_path = f"images/{image_files[0]}"
-        else:
-            image_path = "https://via.placeholder.com/400x400?text=No+Image"
-
-        card = f'''
-    <!-- Product {i} -->
-    <div class="product-card group" data-category="{category}" data-title="{title.lower()}">
-      <div class="relative overflow-hidden rounded-t-2xl">
-        <img src="{image_path}" alt="{title}" class="w-full h-48 sm:h-56 md:h-64 object-cover group-hover:scale-110 transition-transform duration-500" loading="lazy" onerror="this.src='https://via.placeholder.com/400x400?text=Image+Not+Found'">
-        <div class="absolute inset-0 bg-gradient-to-t from-black/70 via-transparent to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300">
-          <div class="absolute bottom-4 left-4 right-4">
-            <button onclick="openModal({i})" class="w-full bg-white/90 backdrop-blur-sm text-black py-2 rounded-lg font-semibold hover:bg-gold transition">
-              Quick View
-            </button>
-          </div>
-        </div>
-      </div>
-      <div class="bg-white p-4 rounded-b-2xl">
-        <h3 class="font-bold text-sm sm:text-base line-clamp-2 h-12 mb-2">{title}</h3>
-        <div class="flex items-center justify-between">
-          <span class="text-xs text-gray-500 uppercase tracking-wide">{category}</span>
-          <button onclick="openModal({i})" class="text-gold hover:text-black transition text-sm font-semibold">Details →</button>
-        </div>
-      </div>
-    </div>'''
-        product_cards.append(card)
-
-    # Generate modal data
-    modal_data = []
-    for i, product in enumerate(products, 1):
-        title = product['title']
-        price = product.get('price', 'N/A')
-        category = get_category(title)
-
-        image_files = [f for f in os.listdir(IMAGES_FOLDER) if f.startswith(f"{i:04d}_")]
-        if image_files:
-            image_path = f"images/{image_files[0]}"
-        else:
-            image_path = "https://via.placeholder.com/400x400?text=No+Image"
-
-        modal_data.append(f'{{ id: {i}, title: "{title.replace('"', '\\"')}", image: "{image_path}", category: "{category}" }}')
-
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Hair Gallery - BURNIE-SHOP</title>
-  <link rel="shortcut icon" href="./fille.jpeg">
-
-  <!-- Tailwind CDN -->
-  <script src="https://cdn.tailwindcss.com"></script>
-
-  <!-- Tailwind config -->
-  <script>
-    tailwind.config = {{
-      theme: {{
-        extend: {{
-          colors: {{
-            primary: '#000000',
-            gold: '#d4af37',
-            'gold-dark': '#b8960c'
-          }}
-        }}
-      }}
-    }}
-  </script>
-
-  <style>
-    .line-clamp-2 {{
-      display: -webkit-box;
-      -webkit-line-clamp: 2;
-      -webkit-box-orient: vertical;
-      overflow: hidden;
-    }}
-
-    .product-card {{
-      transition: all 0.3s ease;
-    }}
-
-    .product-card:hover {{
-      transform: translateY(-8px);
-      box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-    }}
-
-    .filter-btn.active {{
-      background-color: #000;
-      color: #fff;
-    }}
-
-    /* Custom scrollbar */
-    ::-webkit-scrollbar {{
-      width: 8px;
-    }}
-
-    ::-webkit-scrollbar-track {{
-      background: #f1f1f1;
-    }}
-
-    ::-webkit-scrollbar-thumb {{
-      background: #d4af37;
-      border-radius: 4px;
-    }}
-
-    /* Loading animation */
-    @keyframes shimmer {{
-      0% {{ background-position: -200% 0; }}
-      100% {{ background-position: 200% 0; }}
-    }}
-
-    .loading {{
-      background: linear-gradient(90deg, #f0f0f0 25%, #e0e0e0 50%, #f0f0f0 75%);
-      background-size: 200% 100%;
-      animation: shimmer 1.5s infinite;
-    }}
-  </style>
-</head>
-<body class="bg-gray-100 text-gray-900">
-
-<!-- NAVBAR -->
-<nav class="flex justify-between items-center px-4 md:px-8 py-4 bg-white shadow-md sticky top-0 z-50">
-  <div class="flex items-center gap-4">
-    <button onclick="toggleSidebar()" class="md:hidden p-2 rounded-lg hover:bg-gray-100 transition">
-      <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 6h16M4 12h16M4 18h16"></path></svg>
-    </button>
-    <a href="index.html" class="text-xl md:text-2xl font-bold tracking-wide">BURNIE<span class="text-gold">SHOP</span></a>
-  </div>
-
-  <div class="hidden md:flex gap-6 items-center">
-    <div class="relative">
-      <input type="text" id="searchInput" placeholder="Search products..." class="w-64 px-4 py-2 pl-10 bg-gray-100 border-0 rounded-full focus:outline-none focus:ring-2 focus:ring-gold" onkeyup="filterProducts()">
-      <svg class="absolute left-3 top-1/2 transform -translate-y-1/2 h-5 w-5 text-gray-400" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M21 21l-6-6m2-5a7 7 0 11-14 0 7 7 0 0114 0z"></path></svg>
-    </div>
-    <a href="index.html" class="font-semibold hover:text-gold transition">Home</a>
-    <a href="gallery.html" class="font-semibold text-gold">Gallery</a>
-    <a href="contact.html" class="font-semibold hover:text-gold transition">Contact</a>
-  </div>
-</nav>
-
-<!-- MOBILE SIDEBAR -->
-<div id="sidebarOverlay" class="fixed inset-0 bg-black/50 z-40 hidden" onclick="closeSidebar()"></div>
-<div id="sidebar" class="fixed left-0 top-0 h-full w-80 bg-white shadow-2xl z-50 transform -translate-x-full transition-transform duration-300">
-  <div class="p-6">
-    <button onclick="closeSidebar()" class="absolute top-4 right-4 p-2 hover:bg-gray-100 rounded-full transition">
-      <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path></svg>
-    </button>
-    <h2 class="text-xl font-bold mb-6">Menu</h2>
-
-    <div class="mb-6">
-      <input type="text" id="searchInputMobile" placeholder="Search products..." class="w-full px-4 py-3 bg-gray-100 rounded-lg focus:outline-none focus:ring-2 focus:ring-gold" onkeyup="filterProducts()">
-    </div>
-
-    <nav class="space-y-2">
-      <a href="index.html" class="block py-3 px-4 rounded-lg hover:bg-gray-100 transition font-medium">Home</a>
-      <a href="gallery.html" class="block py-3 px-4 rounded-lg bg-gold text-black font-medium">Gallery</a>
-      <a href="contact.html" class="block py-3 px-4 rounded-lg hover:bg-gray-100 transition font-medium">Contact</a>
-    </nav>
-
-    <div class="mt-8 pt-6 border-t">
-      <h3 class="font-semibold mb-4">Follow Us</h3>
-      <div class="flex gap-4">
-        <a href="https://www.facebook.com/share/1AkCdm1ixj/" target="_blank" class="p-2 bg-gray-100 rounded-full hover:bg-gold hover:text-white transition">
-          <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M24 12.073c0-6.627-5.373-12-12-12s-12 5.373-12 12c0 5.99 4.388 10.954 10.125 11.854v-8.385H7.078v-3.47h3.047V9.43c0-3.007 1.792-4.669 4.533-4.669 1.312 0 2.686.235 2.686.235v2.953H15.83c-1.491 0-1.956.925-1.956 1.874v2.25h3.328l-.532 3.47h-2.796v8.385C19.612 23.027 24 18.062 24 12.073z"/></svg>
-        </a>
-        <a href="https://www.instagram.com/burnie_shop" target="_blank" class="p-2 bg-gray-100 rounded-full hover:bg-gold hover:text-white transition">
-          <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M12 2.163c3.204 0 3.584.012 4.85.07 3.252.148 4.771 1.691 4.919 4.919.058 1.265.069 1.645.069 4.849 0 3.205-.012 3.584-.069 4.849-.149 3.225-1.664 4.771-4.919 4.919-1.266.058-1.644.07-4.85.07-3.204 0-3.584-.012-4.849-.07-3.26-.149-4.771-1.699-4.919-4.92-.058-1.265-.07-1.644-.07-4.849 0-3.204.013-3.583.07-4.849.149-3.227 1.664-4.771 4.919-4.919 1.266-.057 1.645-.069 4.849-.069zm0-2.163c-3.259 0-3.667.014-4.947.072-4.358.2-6.78 2.618-6.98 6.98-.059 1.281-.073 1.689-.073 4.948 0 3.259.014 3.668.072 4.948.2 4.358 2.618 6.78 6.98 6.98 1.281.058 1.689.072 4.948.072 3.259 0 3.668-.014 4.948-.072 4.354-.2 6.782-2.618 6.979-6.98.059-1.28.073-1.689.073-4.948 0-3.259-.014-3.667-.072-4.947-.196-4.354-2.617-6.78-6.979-6.98-1.281-.059-1.69-.073-4.949-.073zm0 5.838c-3.403 0-6.162 2.759-6.162 6.162s2.759 6.163 6.162 6.163 6.162-2.759 6.162-6.163c0-3.403-2.759-6.162-6.162-6.162zm0 10.162c-2.209 0-4-1.79-4-4 0-2.209 1.791-4 4-4s4 1.791 4 4c0 2.21-1.791 4-4 4zm6.406-11.845c-.796 0-1.441.645-1.441 1.44s.645 1.44 1.441 1.44c.795 0 1.439-.645 1.439-1.44s-.644-1.44-1.439-1.44z"/></svg>
-        </a>
-        <a href="https://www.tiktok.com/@burnie_shop" target="_blank" class="p-2 bg-gray-100 rounded-full hover:bg-gold hover:text-white transition">
-          <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M19.59 6.69a4.83 4.83 0 0 1-3.77-4.25V2h-3.45v13.67a2.89 2.89 0 0 1-5.2 1.74 2.89 2.89 0 0 1 2.31-4.64 2.93 2.93 0 0 1 .88.13V9.4a6.84 6.84 0 0 0-1-.05A6.33 6.33 0 0 0 5 20.1a6.34 6.34 0 0 0 10.86-4.43v-7a8.16 8.16 0 0 0 4.77 1.52v-3.4a4.85 4.85 0 0 1-1-.1z"/></svg>
-        </a>
-      </div>
-    </div>
-  </div>
-</div>
-
-<!-- HERO SECTION -->
-<section class="relative bg-gradient-to-br from-black via-gray-900 to-black text-white px-4 md:px-16 py-16 md:py-24 overflow-hidden">
-  <div class="absolute inset-0 opacity-20">
-    <div class="absolute inset-0 bg-[radial-gradient(circle_at_30%_50%,#d4af37_0%,transparent_50%)]"></div>
-    <div class="absolute inset-0 bg-[radial-gradient(circle_at_70%_80%,#d4af37_0%,transparent_40%)]"></div>
-  </div>
-  <div class="relative z-10 max-w-4xl mx-auto text-center">
-    <span class="inline-block px-4 py-1 bg-gold/20 text-gold rounded-full text-sm font-semibold mb-6">Premium Collection</span>
-    <h1 class="text-4xl md:text-6xl font-bold mb-6 leading-tight">Discover Your <span class="text-gold">Perfect Style</span></h1>
-    <p class="text-lg md:text-xl text-gray-300 mb-8 max-w-2xl mx-auto">Explore our exclusive collection of {len(products)} premium hair products. 100% virgin hair for the perfect look.</p>
-    <div class="flex flex-wrap justify-center gap-4">
-      <div class="bg-white/10 backdrop-blur-sm px-6 py-3 rounded-full">
-        <span class="text-2xl font-bold text-gold">{len(products)}</span>
-        <span class="text-sm text-gray-300 ml-2">Products</span>
-      </div>
-      <div class="bg-white/10 backdrop-blur-sm px-6 py-3 rounded-full">
-        <span class="text-2xl font-bold text-gold">100%</span>
-        <span class="text-sm text-gray-300 ml-2">Virgin Hair</span>
-      </div>
-      <div class="bg-white/10 backdrop-blur-sm px-6 py-3 rounded-full">
-        <span class="text-2xl font-bold text-gold">Premium</span>
-        <span class="text-sm text-gray-300 ml-2">Quality</span>
-      </div>
-    </div>
-  </div>
-</section>
-
-<!-- FILTER SECTION -->
-<section class="sticky top-16 z-40 bg-white shadow-sm px-4 md:px-8 py-4">
-  <div class="max-w-7xl mx-auto">
-    <div class="flex flex-wrap items-center justify-between gap-4">
-      <div class="flex flex-wrap gap-2">
-        <button onclick="setFilter('all')" class="filter-btn active px-4 py-2 rounded-full text-sm font-semibold border-2 border-black transition hover:bg-black hover:text-white">All</button>
-        <button onclick="setFilter('bundle')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Bundles</button>
-        <button onclick="setFilter('wig')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Wigs</button>
-        <button onclick="setFilter('closure')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Closures</button>
-        <button onclick="setFilter('frontal')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Frontals</button>
-        <button onclick="setFilter('straight')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Straight</button>
-        <button onclick="setFilter('wave')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Wave</button>
-        <button onclick="setFilter('curly')" class="filter-btn px-4 py-2 rounded-full text-sm font-semibold border-2 border-gray-300 transition hover:border-black">Curly</button>
-      </div>
-      <div class="flex items-center gap-4">
-        <select id="sortSelect" onchange="sortProducts()" class="px-4 py-2 bg-gray-100 rounded-lg border-0 focus:ring-2 focus:ring-gold text-sm">
-          <option value="default">Sort by</option>
-          <option value="name">Name: A-Z</option>
-        </select>
-        <span id="productCount" class="text-sm text-gray-500">{len(products)} products</span>
-      </div>
-    </div>
-  </div>
-</section>
-
-<!-- PRODUCTS GRID -->
-<section class="px-4 md:px-8 py-8 md:py-12">
-  <div class="max-w-7xl mx-auto">
-    <div id="productsGrid" class="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 xl:grid-cols-5 gap-4 md:gap-6">
-      {"".join(product_cards)}
-    </div>
-
-    <!-- No Results Message -->
-    <div id="noResults" class="hidden text-center py-16">
-      <svg class="w-24 h-24 mx-auto text-gray-300 mb-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="1" d="M9.172 16.172a4 4 0 015.656 0M9 10h.01M15 10h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>
-      <h3 class="text-xl font-bold text-gray-600 mb-2">No products found</h3>
-      <p class="text-gray-500">Try adjusting your search or filter criteria</p>
-      <button onclick="resetFilters()" class="mt-4 px-6 py-2 bg-gold text-black rounded-full font-semibold hover:bg-gold-dark transition">Reset Filters</button>
-    </div>
-  </div>
-</section>
-
-<!-- CTA SECTION -->
-<section class="bg-gradient-to-r from-gold via-yellow-500 to-gold text-black px-4 md:px-16 py-12 md:py-16">
-  <div class="max-w-4xl mx-auto text-center">
-    <h2 class="text-3xl md:text-4xl font-bold mb-4">Ready to Transform Your Look?</h2>
-    <p class="text-lg mb-8 opacity-80">Contact us today for personalized recommendations and exclusive deals</p>
-    <a href="contact.html" class="inline-block bg-black text-white px-8 py-4 rounded-full font-bold text-lg hover:bg-gray-800 hover:scale-105 transition-all shadow-lg">
-      Contact Us Now
-    </a>
-  </div>
-</section>
-
-<!-- FOOTER -->
-<footer class="bg-gray-900 text-white py-12 px-4">
-  <div class="max-w-6xl mx-auto">
-    <div class="grid md:grid-cols-3 gap-8 mb-8">
-      <div>
-        <h3 class="text-2xl font-bold mb-4">BURNIE<span class="text-gold">SHOP</span></h3>
-        <p class="text-gray-400">Premium quality hair products for the perfect look you deserve.</p>
-      </div>
-      <div>
-        <h4 class="font-bold mb-4">Quick Links</h4>
-        <nav class="space-y-2">
-          <a href="index.html" class="block text-gray-400 hover:text-gold transition">Home</a>
-          <a href="gallery.html" class="block text-gray-400 hover:text-gold transition">Gallery</a>
-          <a href="contact.html" class="block text-gray-400 hover:text-gold transition">Contact</a>
-        </nav>
-      </div>
-      <div>
-        <h4 class="font-bold mb-4">Follow Us</h4>
-        <div class="flex gap-4">
-          <a href="https://www.facebook.com/share/1AkCdm1ixj/" target="_blank" class="p-3 bg-gray-800 rounded-full hover:bg-gold hover:text-black transition">
-            <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M24 12.073c0-6.627-5.373-12-12-12s-12 5.373-12 12c0 5.99 4.388 10.954 10.125 11.854v-8.385H7.078v-3.47h3.047V9.43c0-3.007 1.792-4.669 4.533-4.669 1.312 0 2.686.235 2.686.235v2.953H15.83c-1.491 0-1.956.925-1.956 1.874v2.25h3.328l-.532 3.47h-2.796v8.385C19.612 23.027 24 18.062 24 12.073z"/></svg>
-          </a>
-          <a href="https://www.instagram.com/burnie_shop" target="_blank" class="p-3 bg-gray-800 rounded-full hover:bg-gold hover:text-black transition">
-            <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M12 2.163c3.204 0 3.584.012 4.85.07 3.252.148 4.771 1.691 4.919 4.919.058 1.265.069 1.645.069 4.849 0 3.205-.012 3.584-.069 4.849-.149 3.225-1.664 4.771-4.919 4.919-1.266.058-1.644.07-4.85.07-3.204 0-3.584-.012-4.849-.07-3.26-.149-4.771-1.699-4.919-4.92-.058-1.265-.07-1.644-.07-4.849 0-3.204.013-3.583.07-4.849.149-3.227 1.664-4.771 4.919-4.919 1.266-.057 1.645-.069 4.849-.069zm0-2.163c-3.259 0-3.667.014-4.947.072-4.358.2-6.78 2.618-6.98 6.98-.059 1.281-.073 1.689-.073 4.948 0 3.259.014 3.668.072 4.948.2 4.358 2.618 6.78 6.98 6.98 1.281.058 1.689.072 4.948.072 3.259 0 3.668-.014 4.948-.072 4.354-.2 6.782-2.618 6.979-6.98.059-1.28.073-1.689.073-4.948 0-3.259-.014-3.667-.072-4.947-.196-4.354-2.617-6.78-6.979-6.98-1.281-.059-1.69-.073-4.949-.073zm0 5.838c-3.403 0-6.162 2.759-6.162 6.162s2.759 6.163 6.162 6.163 6.162-2.759 6.162-6.163c0-3.403-2.759-6.162-6.162-6.162zm0 10.162c-2.209 0-4-1.79-4-4 0-2.209 1.791-4 4-4s4 1.791 4 4c0 2.21-1.791 4-4 4zm6.406-11.845c-.796 0-1.441.645-1.441 1.44s.645 1.44 1.441 1.44c.795 0 1.439-.645 1.439-1.44s-.644-1.44-1.439-1.44z"/></svg>
-          </a>
-          <a href="https://www.tiktok.com/@burnie_shop" target="_blank" class="p-3 bg-gray-800 rounded-full hover:bg-gold hover:text-black transition">
-            <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24"><path d="M19.59 6.69a4.83 4.83 0 0 1-3.77-4.25V2h-3.45v13.67a2.89 2.89 0 0 1-5.2 1.74 2.89 2.89 0 0 1 2.31-4.64 2.93 2.93 0 0 1 .88.13V9.4a6.84 6.84 0 0 0-1-.05A6.33 6.33 0 0 0 5 20.1a6.34 6.34 0 0 0 10.86-4.43v-7a8.16 8.16 0 0 0 4.77 1.52v-3.4a4.85 4.85 0 0 1-1-.1z"/></svg>
-          </a>
-        </div>
-      </div>
-    </div>
-    <div class="border-t border-gray-800 pt-8 text-center text-gray-500">
-      <p>&copy; 2026 BURNIE-SHOP. All rights reserved.</p>
-    </div>
-  </div>
-</footer>
-
-<!-- MODAL -->
-<div id="modal" class="hidden fixed inset-0 bg-black/90 z-50 flex items-center justify-center p-4 backdrop-blur-sm">
-  <div class="bg-white rounded-2xl max-w-2xl w-full max-h-[90vh] overflow-hidden shadow-2xl">
-    <div class="relative">
-      <button onclick="closeModal()" class="absolute top-4 right-4 z-10 p-2 bg-white/90 rounded-full shadow-lg hover:bg-gray-100 transition">
-        <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path></svg>
-      </button>
-      <img id="modalImage" src="" class="w-full h-64 sm:h-80 object-cover" alt="">
-    </div>
-    <div class="p-6">
-      <div class="flex items-start justify-between mb-4">
-        <div>
-          <span id="modalCategory" class="text-xs text-gold uppercase tracking-wide font-semibold"></span>
-          <h2 id="modalTitle" class="text-xl sm:text-2xl font-bold mt-1"></h2>
-        </div>
-      </div>
-      <div class="flex gap-3">
-        <a href="contact.html" class="flex-1 bg-black text-white py-3 rounded-xl font-bold text-center hover:bg-gray-800 transition">
-          Contact for Purchase
-        </a>
-        <button onclick="closeModal()" class="px-6 py-3 border-2 border-gray-200 rounded-xl font-semibold hover:bg-gray-100 transition">
-          Close
-        </button>
-      </div>
-    </div>
-  </div>
-</div>
-
-<!-- Back to Top Button -->
-<button id="backToTop" onclick="scrollToTop()" class="fixed bottom-6 right-6 p-3 bg-gold text-black rounded-full shadow-lg opacity-0 invisible transition-all hover:bg-gold-dark hover:scale-110">
-  <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 10l7-7m0 0l7 7m-7-7v18"></path></svg>
-</button>
-
-<!-- JAVASCRIPT -->
-<script>
-  // Product data
-  const products = [
-    {",".join(modal_data)}
-  ];
-
-  let currentFilter = 'all';
-  let currentSearch = '';
-
-  // Filter products by category
-  function setFilter(category) {{
-    currentFilter = category;
-
-    // Update button styles
-    document.querySelectorAll('.filter-btn').forEach(btn => {{
-      btn.classList.remove('active', 'bg-black', 'text-white', 'border-black');
-      btn.classList.add('border-gray-300');
-    }});
-    event.target.classList.add('active', 'bg-black', 'text-white', 'border-black');
-    event.target.classList.remove('border-gray-300');
-
-    applyFilters();
-  }}
-
-  // Search products
-  function filterProducts() {{
-    const desktopSearch = document.getElementById('searchInput')?.value || '';
-    const mobileSearch = document.getElementById('searchInputMobile')?.value || '';
-    currentSearch = (desktopSearch || mobileSearch).toLowerCase().trim();
-
-    // Sync inputs
-    if (document.getElementById('searchInput')) document.getElementById('searchInput').value = currentSearch;
-    if (document.getElementById('searchInputMobile')) document.getElementById('searchInputMobile').value = currentSearch;
-
-    applyFilters();
-  }}
-
-  // Apply all filters
-  function applyFilters() {{
-    const cards = document.querySelectorAll('.product-card');
-    let visibleCount = 0;
-
-    cards.forEach(card => {{
-      const category = card.dataset.category;
-      const title = card.dataset.title;
-
-      const matchesCategory = currentFilter === 'all' || category === currentFilter;
-      const matchesSearch = currentSearch === '' || title.includes(currentSearch);
-
-      if (matchesCategory && matchesSearch) {{
-        card.style.display = 'block';
-        card.style.opacity = '1';
-        visibleCount++;
-      }} else {{
-        card.style.opacity = '0';
-        setTimeout(() => card.style.display = 'none', 200);
-      }}
-    }});
-
-    // Update count and show/hide no results
-    document.getElementById('productCount').textContent = visibleCount + ' products';
-    document.getElementById('noResults').classList.toggle('hidden', visibleCount > 0);
-  }}
-
-  // Sort products
-  function sortProducts() {{
-    const sortBy = document.getElementById('sortSelect').value;
-    const grid = document.getElementById('productsGrid');
-    const cards = Array.from(grid.querySelectorAll('.product-card'));
-
-    cards.sort((a, b) => {{
-      if (sortBy === 'name') {{
-        return a.dataset.title.localeCompare(b.dataset.title);
-      }}
-      return 0;
-    }});
-
-    cards.forEach(card => grid.appendChild(card));
-  }}
-
-  // Reset filters
-  function resetFilters() {{
-    currentFilter = 'all';
-    currentSearch = '';
-    document.getElementById('searchInput').value = '';
-    document.getElementById('searchInputMobile').value = '';
-    document.getElementById('sortSelect').value = 'default';
-
-    document.querySelectorAll('.filter-btn').forEach((btn, i) => {{
-      btn.classList.remove('active', 'bg-black', 'text-white', 'border-black');
-      btn.classList.add('border-gray-300');
-      if (i === 0) {{
-        btn.classList.add('active', 'bg-black', 'text-white', 'border-black');
-        btn.classList.remove('border-gray-300');
-      }}
-    }});
-
-    applyFilters();
-  }}
-
-  // Modal functions
-  function openModal(productId) {{
-    const product = products.find(p => p.id === productId);
-    if (!product) return;
-
-    document.getElementById('modalImage').src = product.image;
-    document.getElementById('modalTitle').textContent = product.title;
-    document.getElementById('modalCategory').textContent = product.category;
-    document.getElementById('modal').classList.remove('hidden');
-    document.body.style.overflow = 'hidden';
-  }}
-
-  function closeModal() {{
-    document.getElementById('modal').classList.add('hidden');
-    document.body.style.overflow = '';
-  }}
-
-  // Close modal on backdrop click
-  document.getElementById('modal')?.addEventListener('click', function(e) {{
-    if (e.target === this) closeModal();
-  }});
-
-  // Close modal on Escape key
-  document.addEventListener('keydown', function(e) {{
-    if (e.key === 'Escape') closeModal();
-  }});
-
-  // Sidebar functions
-  function toggleSidebar() {{
-    document.getElementById('sidebar').classList.toggle('-translate-x-full');
-    document.getElementById('sidebarOverlay').classList.toggle('hidden');
-  }}
-
-  function closeSidebar() {{
-    document.getElementById('sidebar').classList.add('-translate-x-full');
-    document.getElementById('sidebarOverlay').classList.add('hidden');
-  }}
-
-  // Back to top
-  function scrollToTop() {{
-    window.scrollTo({{ top: 0, behavior: 'smooth' }});
-  }}
-
-  // Show/hide back to top button
-  window.addEventListener('scroll', function() {{
-    const btn = document.getElementById('backToTop');
-    if (window.scrollY > 500) {{
-      btn.classList.remove('opacity-0', 'invisible');
-      btn.classList.add('opacity-100', 'visible');
-    }} else {{
-      btn.classList.add('opacity-0', 'invisible');
-      btn.classList.remove('opacity-100', 'visible');
-    }}
-  }});
-</script>
-
-</body>
-</html>'''
-
-    return html
-
-
-def main():
-    # Read products from CSV
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        products = list(reader)
 
-    print(f"Loaded {len(products)} products from {CSV_FILE}")
+def resolve_thumbnails(image_paths):
+    """Return the thumbnail srcsets (format -> srcset) of every image."""
+    manifest = load_manifest()
+    return [srcsets(manifest.get(image_path)) for image_path in image_paths]
+
+
+def render_card(i, title, labels, image_path, thumbs=None, price=None, hidden=frozenset()):
+    """Render the grid card of one product from templates/gallery_card.html.
+
+    `labels` are the product's categories, primary first.
+
+    `thumbs` maps an image format to a srcset of resized variants; AVIF is
+    offered through a <source>, WebP through the <img> itself.
+
+    `hidden` names CARD_FIELDS to leave out; the price tag is only shown
+    for products that have a price.
+    """
+    return templates.render("gallery_card.html", i=i, title=title, labels=labels, image_path=image_path,
+                            thumbs=thumbs or {}, price=price, hidden=hidden, sizes=SIZES,
+                            fallback=BROKEN_IMAGE)
+
+
+def card_template(hidden=frozenset()):
+    """Render the card the page clones for products loaded from the feed.
+
+    It is render_card() with empty values and every optional part present
+    (price tag, AVIF and WebP srcsets); the page fills them in or removes
+    them, so both kinds of card come from templates/gallery_card.html.
+    """
+    return render_card(0, "", ("",), "", {"avif": "", "webp": ""}, "-", hidden)
 
-    # Generate HTML
-    html = generate_html(products)
 
-    # Write to file
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(html)
+def icon(name):
+    """Draw one of SOCIAL_ICONS from the page's sprite."""
+    return f'<svg class="w-5 h-5" fill="currentColor"><use href="#icon-{name}"/></svg>'
 
+
+def icon_sprite():
+    """The hidden <svg> defining SOCIAL_ICONS once for the whole page."""
+    symbols = "".join(f'<symbol id="icon-{name}" viewBox="0 0 24 24"><path d="{path}"/></symbol>'
+                      for name, path in SOCIAL_ICONS.items())
+    return f'<svg width="0" height="0" style="position:absolute" aria-hidden="true">{symbols}</svg>'
+
+
+def feed_entry(i, title, labels, image_path, thumbs=None, price=None):
+    """Build the JSON feed record of one product."""
+    entry = {"id": i, "title": title, "image": image_path, "category": labels[0], "categories": list(labels)}
+    if thumbs:
+        entry["thumbs"] = thumbs
+    if price:
+        entry["price"] = price
+    return entry
+
+
+def product_price(product, hidden):
+    """Return the price to display for a product row, or None."""
+    return None if "price" in hidden else product.get("price") or None
+
+
+def iter_feed(products, image_paths, thumbnails, hidden=frozenset()):
+    """Yield the feed record of each product, in catalog order."""
+    for i, (product, image_path, thumbs) in enumerate(zip(products, image_paths, thumbnails), 1):
+        title = product['title']
+        yield feed_entry(i, title, classify(title), image_path, thumbs, product_price(product, hidden))
+
+
+def build_feed(products, image_paths, thumbnails, hidden=frozenset()):
+    """Build the feed records of every product, in catalog order."""
+    return list(iter_feed(products, image_paths, thumbnails, hidden))
+
+
+def chunk_file(n):
+    """Return the site-relative path of feed chunk `n`."""
+    return f"{DATA_FOLDER}/products-{n:03d}.json"
+
+
+def chunk_files(count):
+    """Return the site-relative paths of the feed chunks for `count` products."""
+    return [chunk_file(n) for n in range((count + CHUNK_SIZE - 1) // CHUNK_SIZE)]
+
+
+def write_if_changed(filepath, data):
+    """Write `data` to `filepath` unless it already holds exactly that.
+
+    Returns True if the file was written.
+    """
+    if os.path.exists(filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            if f.read() == data:
+                return False
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(data)
+    return True
+
+
+def tokenize(text):
+    """Split text into lowercase search tokens (runs of letters and digits)."""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def bitset(ids, size):
+    """Encode product ids (1..size) as a list of 32-bit words."""
+    words = [0] * (size // 32 + 1)
+    for product_id in ids:
+        words[product_id >> 5] |= 1 << (product_id & 31)
+    return words
+
+
+def build_search_index(entries):
+    """Build the client-side search index from the feed records.
+
+    Tokens are sorted so the page can find every token starting with a
+    typed prefix by binary search; ``postings[n]`` lists the ids of the
+    products whose title contains ``tokens[n]``. Each category is a bitset
+    of product ids, so filters combine with searches by bitwise AND.
+    """
+    postings = {}
+    category_ids = {}
+    count = 0
+    for entry in entries:
+        count += 1
+        for token in sorted(set(tokenize(entry["title"]))):
+            postings.setdefault(token, []).append(entry["id"])
+        for category in entry["categories"]:
+            category_ids.setdefault(category, []).append(entry["id"])
+
+    tokens = sorted(postings)
+    return {
+        "tokens": tokens,
+        "postings": [postings[token] for token in tokens],
+        "categories": {name: bitset(ids, count) for name, ids in sorted(category_ids.items())},
+    }
+
+
+def write_feed(entries):
+    """Write the feed as JSON chunks, plus its search index, next to OUTPUT_FILE.
+
+    `entries` may be an iterator: each chunk is written as soon as it is
+    full, so only one chunk of records is held at a time. Files whose
+    content is unchanged are not rewritten and chunks left over from a
+    larger catalog are removed. Returns the number of files written.
+    """
+    root = os.path.dirname(os.path.abspath(OUTPUT_FILE))
+    folder = os.path.join(root, DATA_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+
+    written = 0
+    paths = []
+
+    def chunked():
+        # Pass the records on to the search index, writing each chunk once it is full
+        nonlocal written
+        records = iter(entries)
+        while True:
+            chunk = list(itertools.islice(records, CHUNK_SIZE))
+            if not chunk:
+                return
+            path = chunk_file(len(paths))
+            data = json.dumps(chunk, ensure_ascii=False, separators=(",", ":"))
+            written += write_if_changed(os.path.join(root, path), data)
+            paths.append(path)
+            yield from chunk
+
+    index = json.dumps(build_search_index(chunked()), ensure_ascii=False, separators=(",", ":"))
+    written += write_if_changed(os.path.join(root, SEARCH_INDEX_FILE), index)
+
+    current = {os.path.basename(path) for path in paths}
+    for name in os.listdir(folder):
+        if name.startswith("products-") and name.endswith(".json") and name not in current:
+            os.remove(os.path.join(folder, name))
+    return written
+
+
+def image_signature(path):
+    """Return a cheap change marker for a local image (size, mtime)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def fingerprint(*parts):
+    """Hash JSON-serialisable build inputs into a short cache key."""
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def generator_version():
+    """Fingerprint of this script, its templates and the category rules, so edits invalidate the cache."""
+    digest = hashlib.sha1()
+    for path in (__file__, categories.__file__, *templates.paths()):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def product_fingerprints(products, image_paths, thumbnails, hidden=frozenset(), known=None):
+    """Fingerprint each product row together with its image file, thumbnails and hidden fields.
+
+    `known` maps catalog keys to fingerprints that are still valid (see
+    reusable_fingerprints); those products are not hashed again.
+    """
+    hidden = sorted(hidden)
+    known = known or {}
+    return [
+        known.get(product.get("key"))
+        or fingerprint(i, product, image_path, image_signature(image_path), thumbs, hidden)
+        for i, (product, image_path, thumbs) in enumerate(zip(products, image_paths, thumbnails), 1)
+    ]
+
+
+def immutable_image(image_path):
+    """True for images whose path changes whenever their content does (store blobs and URLs)."""
+    return image_path.startswith(("http://", "https://")) or os.path.dirname(image_path) == STORE_FOLDER
+
+
+def reusable_fingerprints(cache, products, image_paths, thumbnails, hidden=frozenset()):
+    """Return `{key: fingerprint}` for products unchanged in the catalog since the last build.
+
+    The catalog's change log says which products changed; the others keep
+    their cached fingerprint as long as their image and thumbnails are the
+    same and the image is immutable. Records the catalog's position in
+    `cache` for the next build. Without a catalog nothing is reused.
+    """
+    previous, cache["catalog"] = cache.get("catalog"), None
+    if not os.path.exists(CATALOG_FILE):
+        return {}
+    with Catalog(CATALOG_FILE) as catalog:
+        cache["catalog"] = [catalog.created(), catalog.last_change()]
+        if (not previous or previous[0] != cache["catalog"][0] or previous[1] > cache["catalog"][1]
+                or cache.get("hidden") != sorted(hidden)):
+            return {}
+        changed = {product["key"] for product in catalog.changed_since(previous[1])}
+    print(f"{len(changed)} of {len(products)} product(s) changed in the catalog since the last build")
+
+    entries = cache.get("products", {})
+    known = {}
+    for product, image_path, thumbs in zip(products, image_paths, thumbnails):
+        key = product.get("key")
+        entry = entries.get(key)
+        if key in changed or entry is None or entry[:2] != [image_path, thumbs]:
+            continue
+        if immutable_image(image_path):
+            known[key] = entry[2]
+    return known
+
+
+def load_build_cache():
+    """Load rendered fragments from previous incremental builds."""
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == generator_version():
+            return cache
+    return {"version": generator_version(), "page": None, "fragments": {}}
+
+
+def save_build_cache(cache):
+    """Write the incremental build cache atomically."""
+    tmp_file = CACHE_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_file, CACHE_FILE)
+
+
+def stream_html(products, image_paths=None, thumbnails=None, fingerprints=None, fragments=None,
+                hidden=frozenset()):
+    """Render the gallery page from templates/gallery.html as a stream of text.
+
+    Only the first FIRST_PAGE_SIZE cards are rendered into the page; the
+    rest, and the data the modal reads, come from the JSON chunks written by
+    write_feed(). `fragments` maps product fingerprints to previously
+    rendered cards; cards found there are reused, new ones are rendered and
+    added to it. `hidden` names CARD_FIELDS and PAGE_SECTIONS to leave out.
+    """
+    if image_paths is None:
+        image_paths = resolve_images(products)
+    if thumbnails is None:
+        thumbnails = resolve_thumbnails(image_paths)
+    if fingerprints is None:
+        fingerprints = [None] * len(products)
+
+    def cards():
+        for i, product in enumerate(products[:FIRST_PAGE_SIZE], 1):
+            key = fingerprints[i - 1]
+            card = fragments.get(key) if fragments is not None and key else None
+            if card is None:
+                title = product['title']
+                card = render_card(i, title, classify(title), image_paths[i - 1], thumbnails[i - 1],
+                                   product_price(product, hidden), hidden)
+                if fragments is not None and key:
+                    fragments[key] = card
+            yield card
+
+    feed = {
+        "sizes": SIZES,
+        "total": len(products),
+        "rendered": min(len(products), FIRST_PAGE_SIZE),
+        "chunkSize": CHUNK_SIZE,
+        "chunks": chunk_files(len(products)),
+        "searchIndex": SEARCH_INDEX_FILE,
+        "hidden": sorted(hidden & set(CARD_FIELDS)),
+    }
+    return templates.stream("gallery.html", total=len(products), cards=cards(), feed=json.dumps(feed),
+                            card_template=card_template(hidden), hidden=hidden, icon=icon,
+                            icon_sprite=icon_sprite)
+
+
+def generate_html(products, image_paths=None, thumbnails=None, fingerprints=None, fragments=None,
+                  hidden=frozenset()):
+    """Generate the gallery HTML as one string (see stream_html)."""
+    return "".join(stream_html(products, image_paths, thumbnails, fingerprints, fragments, hidden))
+
+
+def main(incremental=False, hidden=frozenset(), profile=()):
+    run = metrics.start("generate_gallery", profile)
+    # Read products from the catalog (or the CSV when there is none)
+    with metrics.stage("load"):
+        products = load_products(CSV_FILE)
+    metrics.count("products", len(products))
+
+    print(f"Loaded {len(products)} products from {CSV_FILE}")
+
+    with metrics.stage("resolve"):
+        image_paths = resolve_images(products)
+        thumbnails = resolve_thumbnails(image_paths)
+    if not incremental:
+        page = stream_html(products, image_paths, thumbnails, hidden=hidden)
+    else:
+        cache = load_build_cache()
+        known = reusable_fingerprints(cache, products, image_paths, thumbnails, hidden)
+        fingerprints = product_fingerprints(products, image_paths, thumbnails, hidden, known)
+        metrics.count("products.fingerprinted", len(products) - len(known))
+        cache["hidden"] = sorted(hidden)
+        cache["products"] = {
+            product["key"]: [image_path, thumbs, key]
+            for product, image_path, thumbs, key in zip(products, image_paths, thumbnails, fingerprints)
+            if "key" in product
+        }
+        page_key = fingerprint(fingerprints, sorted(hidden))
+        if cache["page"] == page_key and os.path.exists(OUTPUT_FILE):
+            save_build_cache(cache)   # Still records how far the catalog has been read
+            print(f"{OUTPUT_FILE} is up to date.")
+            print(f"Metrics saved to: {run.save()}")
+            return
+
+        # Keep only fragments still in use so the cache tracks the catalog
+        previous = cache["fragments"]
+        first_page = fingerprints[:FIRST_PAGE_SIZE]
+        fragments = {key: previous[key] for key in first_page if key in previous}
+        stale = len(set(first_page) - set(fragments))
+        metrics.count("cards.rendered", stale)
+        print(f"Re-rendering {stale} of {len(first_page)} cards")
+        page = stream_html(products, image_paths, thumbnails, fingerprints, fragments, hidden)
+        cache["fragments"] = fragments
+        cache["page"] = page_key
+
+    # The page is rendered while it is written, so it is never held whole in memory
+    with metrics.stage("render"):
+        size = templates.write(OUTPUT_FILE, page)
+    with metrics.stage("write"):
+        written = write_feed(iter_feed(products, image_paths, thumbnails, hidden))
+        if incremental:
+            save_build_cache(cache)
+    metrics.count("bytes.html", size)
+    metrics.count("feed.chunks_written", written)
+
+    # Fill in the stylesheet block; build_css imports this module, so import it late
+    from build_css import CSS_FILE, build
+    with metrics.stage("css"):
+        rules, _, _ = build()
+
+    print(f"Wrote {written} product chunk(s) to {DATA_FOLDER}/")
+    print(f"Compiled {rules} CSS rules into {CSS_FILE}")
     print(f"Generated {OUTPUT_FILE} successfully!")
     print(f"Open {OUTPUT_FILE} in a browser to view the gallery.")
+    print(run.report())
+    print(f"Metrics saved to: {run.save()}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate gallery.html from products.csv")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-render only cards whose product row or image changed")
+    parser.add_argument("--hide", default="",
+                        help="comma-separated card fields (%s) or page sections (%s) to leave out"
+                             % (", ".join(CARD_FIELDS), ", ".join(PAGE_SECTIONS)))
+    parser.add_argument("--profile", metavar="STAGES", type=metrics.parse_profile, default=set(),
+                        help="run these comma-separated stages (load, resolve, render, write, css or all) under cProfile")
+    args = parser.parse_args()
+    hidden = frozenset(name.strip() for name in args.hide.split(",") if name.strip())
+    unknown = hidden - set(CARD_FIELDS) - set(PAGE_SECTIONS)
+    if unknown:
+        parser.error(f"unknown --hide name(s): {', '.join(sorted(unknown))}")
+    main(incremental=args.incremental, hidden=hidden, profile=args.profile)
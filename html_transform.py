@@ -0,0 +1,78 @@
+import os
+import re
+
+# Configuration
+CHUNK_SIZE = 65536   # Characters read per chunk
+WINDOW = 4096        # Longest match a substitution must find across a chunk boundary
+
+
+class Substitution:
+    """A streaming regex substitution over chunks of text.
+
+    Text is buffered only as far as needed: everything more than `window`
+    characters before the end of the buffer is matched, replaced and passed
+    on, and the rest waits for the next chunk. A match therefore never
+    straddles a chunk boundary, provided no match is longer than `window`.
+    """
+
+    def __init__(self, pattern, repl="", flags=0, window=WINDOW):
+        self.pattern = re.compile(pattern, flags)
+        self.repl = repl
+        self.window = window
+        self.count = 0
+
+    def _replace(self, match):
+        self.count += 1
+        return match.expand(self.repl) if isinstance(self.repl, str) else self.repl(match)
+
+    def apply(self, chunks):
+        """Yield the transformed text of an iterable of text chunks."""
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            safe = len(buffer) - self.window
+            if safe <= 0:
+                continue
+            # Replace matches that end before the safe point; the first one
+            # reaching past it is kept in the buffer with everything after
+            out = []
+            pos = 0
+            for match in self.pattern.finditer(buffer):
+                if match.end() > safe:
+                    safe = min(safe, match.start())
+                    break
+                out.append(buffer[pos:match.start()])
+                out.append(self._replace(match))
+                pos = match.end()
+            safe = max(safe, pos)
+            out.append(buffer[pos:safe])
+            buffer = buffer[safe:]
+            yield "".join(out)
+        yield self.pattern.sub(self._replace, buffer)
+
+
+def read_chunks(path, size=CHUNK_SIZE):
+    """Yield a text file in chunks of `size` characters."""
+    with open(path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(size), ""):
+            yield chunk
+
+
+def transform_file(path, stages, output=None):
+    """Stream `path` through `stages` into `output` (default: in place).
+
+    The result is written to a temporary file next to the output and moved
+    over it at the end, so an interrupted run leaves the original intact.
+    Returns the number of replacements made by each stage.
+    """
+    output = output or path
+    chunks = read_chunks(path)
+    for stage in stages:
+        chunks = stage.apply(chunks)
+
+    tmp_file = output + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_file, output)
+    return [stage.count for stage in stages]
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+
+from image_store import IMAGES_FOLDER, canonical_url
+
+# Configuration
+CACHE_FILE = os.path.join(IMAGES_FOLDER, "http_cache.json")
+
+
+class HttpCache:
+    """Persistent ETag / Last-Modified / Content-Length record per image URL.
+
+    Entries are keyed by canonical URL and remember which store blob the
+    response body was saved as, so a 304 can reuse it without a download.
+    """
+
+    def __init__(self, cache_file=CACHE_FILE):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, url):
+        """Return the cached entry for `url`, or None."""
+        return self.entries.get(canonical_url(url))
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for `url`.
+
+        Nothing is returned when the stored blob is missing or its size no
+        longer matches the recorded Content-Length, forcing a full fetch.
+        """
+        entry = self.get(url)
+        if not entry:
+            return {}
+        blob = entry.get("blob")
+        if not blob or not os.path.exists(blob):
+            return {}
+        length = entry.get("content_length")
+        if length is not None and os.path.getsize(blob) != length:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, response_headers, blob):
+        """Record the validators of a 200 response saved as `blob`."""
+        with self.lock:
+            self.entries[canonical_url(url)] = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                # Bytes actually stored; Content-Length may describe an encoded body
+                "content_length": os.path.getsize(blob),
+                "blob": blob,
+            }
+
+    def replace_blob(self, old, new):
+        """Point the entries saved as blob `old` at `new`, which holds the same image re-encoded.
+
+        The validators still describe the server's copy, so a 304 keeps
+        the new blob; its size is recorded so revalidation goes on working.
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                if entry.get("blob") == old:
+                    entry["blob"] = new
+                    entry["content_length"] = os.path.getsize(new)
+
+    def save(self):
+        """Write the cache atomically."""
+        with self.lock:
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, self.cache_file)
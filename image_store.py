@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Configuration
+IMAGES_FOLDER = "images"
+STORE_FOLDER = os.path.join(IMAGES_FOLDER, "blobs")
+MANIFEST_FILE = os.path.join(IMAGES_FOLDER, "manifest.json")
+# Query parameters that only select a rendition of the same CDN image
+IGNORED_PARAMS = {"width", "height", "crop"}
+# Leading bytes of each image format, and the extension a file of it is stored under
+SIGNATURES = [(b"\xff\xd8\xff", "jpeg"), (b"\x89PNG\r\n\x1a\n", "png"), (b"GIF87a", "gif"), (b"GIF89a", "gif")]
+EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "gif": ".gif", "webp": ".webp", "avif": ".avif"}
+
+
+def canonical_url(url):
+    """Normalise a CDN URL so resized variants of one image share a key."""
+    parsed = urlparse(url.strip())
+    if parsed.scheme == "" and url.startswith("//"):
+        parsed = urlparse("https:" + url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query)
+        if key.lower() not in IGNORED_PARAMS
+    )
+    return urlunparse((
+        parsed.scheme.lower() or "https",
+        parsed.netloc.lower(),
+        parsed.path,
+        "",
+        urlencode(query),
+        "",
+    ))
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sniff_image(head):
+    """Return the image format ("jpeg", "png"...) of a file's first 16 bytes, or None."""
+    for signature, fmt in SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return "avif"
+    return None
+
+
+def image_format(path):
+    """Return the image format of a file from its magic bytes, or None if it is not an image."""
+    with open(path, "rb") as f:
+        return sniff_image(f.read(16))
+
+
+def build_image_index(folder=IMAGES_FOLDER):
+    """Scan `folder` once and map each row prefix (``"0001"``) to its image.
+
+    Files are visited in name order and the first one per prefix wins, so
+    callers can resolve any number of products with dictionary lookups
+    instead of listing the directory per product.
+    """
+    index = {}
+    if not os.path.isdir(folder):
+        return index
+    with os.scandir(folder) as entries:
+        names = sorted(entry.name for entry in entries if entry.is_file())
+    for name in names:
+        prefix, sep, _ = name.partition("_")
+        if sep and prefix.isdigit() and prefix not in index:
+            index[prefix] = f"{folder}/{name}".replace(os.sep, "/")
+    return index
+
+
+class ImageStore:
+    """Images stored once under their content hash, plus a JSON manifest.
+
+    The manifest maps canonical image URLs and product keys (the product
+    handle, or the zero-padded CSV row number of a row without one: see
+    catalog.product_key) to blob paths relative to the site root, e.g.
+    ``images/blobs/3f2a9c0e1b7d4a55.jpg``.
+    """
+
+    def __init__(self, store_folder=STORE_FOLDER, manifest_file=MANIFEST_FILE):
+        self.store_folder = store_folder
+        self.manifest_file = manifest_file
+        self.lock = threading.Lock()
+        self.urls = {}
+        self.products = {}
+        if os.path.exists(manifest_file):
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.urls = manifest.get("urls", {})
+            self.products = manifest.get("products", {})
+
+    def lookup(self, url):
+        """Return the blob path already stored for `url`, or None."""
+        blob = self.urls.get(canonical_url(url))
+        if blob and os.path.exists(blob):
+            return blob
+        return None
+
+    def product_image(self, key):
+        """Return the blob path linked to a product key, or None."""
+        return self.products.get(key)
+
+    def temp_path(self):
+        """Return a fresh temporary path inside the store for a download."""
+        os.makedirs(self.store_folder, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.store_folder, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    def add_file(self, path, url, ext):
+        """Move a downloaded file into the store and record it for `url`.
+
+        If a blob with the same content already exists the file is deleted
+        instead, so identical images are kept on disk exactly once.
+        """
+        blob = self._blob_path(path, ext)
+        with self.lock:
+            self._move_in(path, blob)
+            self.urls[canonical_url(url)] = blob
+        return blob
+
+    def replace_blob(self, old, path):
+        """Store `path` as the new content of blob `old` (a re-encoding of it, say).
+
+        Blobs are never modified in place: the new content gets its own
+        content-addressed name, the URLs and products that pointed at `old`
+        are moved over to it and `old` is deleted. Returns the new blob path.
+        """
+        blob = self._blob_path(path, os.path.splitext(old)[1])
+        with self.lock:
+            self._move_in(path, blob)
+            for mapping in (self.urls, self.products):
+                for key, value in mapping.items():
+                    if value == old:
+                        mapping[key] = blob
+            if blob != old and os.path.exists(old):
+                os.remove(old)
+        return blob
+
+    def _blob_path(self, path, ext):
+        return f"{self.store_folder}/{file_digest(path)[:16]}{ext}".replace(os.sep, "/")
+
+    def _move_in(self, path, blob):
+        os.makedirs(self.store_folder, exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.replace(path, blob)
+
+    def link_product(self, key, blob):
+        """Point a product key at a stored blob."""
+        with self.lock:
+            self.products[key] = blob
+
+    def retain_products(self, keys):
+        """Forget the products whose key is not in `keys` (removed, or keyed by an old scheme)."""
+        keys = set(keys)
+        with self.lock:
+            self.products = {key: blob for key, blob in self.products.items() if key in keys}
+
+    def save(self):
+        """Write the manifest atomically."""
+        with self.lock:
+            manifest = {"urls": self.urls, "products": self.products}
+            tmp_file = self.manifest_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_file, self.manifest_file)
@@ -0,0 +1,195 @@
+import bisect
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+# Configuration
+METRICS_FOLDER = "metrics"     # One JSON file per run: <script>-<time>-<pid>.json
+PROFILE_FOLDER = "profiles"    # cProfile dumps of profiled stages, for pstats/snakeviz
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """Latency histogram over fixed millisecond buckets."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # The last bucket is everything above
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile `q` (the max for the last one)."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts) if count}
+        if self.counts[-1]:
+            buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "min_ms": round(self.min, 3) if self.count else None,
+            "max_ms": round(self.max, 3) if self.count else None,
+            "p50_ms": round(self.quantile(0.5), 3) if self.count else None,
+            "p95_ms": round(self.quantile(0.95), 3) if self.count else None,
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """Stage timers, counters and latency histograms for one script run.
+
+    Stages are the coarse phases of a run (crawl, download, render); each
+    records wall and CPU time and can be profiled with cProfile. Spans time
+    many small operations (one page load, one request) into a histogram.
+    Counters add up bytes, HTTP statuses, retries and error classes. All of
+    it is thread-safe and written as one JSON file per run.
+    """
+
+    def __init__(self, script="run", profile=()):
+        self.script = script
+        self.profile = set(profile)
+        self.started = datetime.datetime.now()
+        # Names this run's files; microseconds and the pid keep runs started in the same second apart
+        self.run_id = f"{script}-{self.started:%Y%m%d-%H%M%S-%f}-{os.getpid()}"
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.histograms = {}
+        self.stages = {}
+        self.profiling = False
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name, ms):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the block into the `name` histogram, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a phase of the run, under cProfile if it was asked for.
+
+        cProfile follows the calling thread only, so for a stage that hands
+        its work to a pool the profile shows where the coordinating thread
+        waits, while the spans inside the workers show the work itself.
+        """
+        profiler = None
+        if not self.profiling and (name in self.profile or "all" in self.profile):
+            profiler = cProfile.Profile()
+            self.profiling = True
+            profiler.enable()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            seconds, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            if profiler:
+                profiler.disable()
+                self.profiling = False
+                os.makedirs(PROFILE_FOLDER, exist_ok=True)
+                profiler.dump_stats(os.path.join(PROFILE_FOLDER, f"{self.run_id}-{name}.prof"))
+            with self.lock:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+                entry["seconds"] += seconds
+                entry["cpu_seconds"] += cpu
+                entry["calls"] += 1
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "script": self.script,
+                "started": self.started.isoformat(timespec="seconds"),
+                "seconds": round(time.perf_counter() - self.start_time, 3),
+                "stages": {name: {key: round(value, 3) if isinstance(value, float) else value
+                                  for key, value in entry.items()} for name, entry in self.stages.items()},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def save(self, folder=METRICS_FOLDER):
+        """Write the run's metrics atomically; returns the file path."""
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{self.run_id}.json")
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_file, path)
+        return path
+
+    def report(self):
+        """One line of stage timings, for the end-of-run summary."""
+        return "Stages: " + ", ".join(f"{name} {entry['seconds']:.1f}s" for name, entry in self.stages.items())
+
+
+# The current run. Library code records into it through the functions below,
+# so nothing needs to be threaded through call signatures; start() replaces it.
+_current = Metrics()
+
+
+def start(script, profile=()):
+    """Begin recording a new run of `script`, profiling the named stages ("all" for every one)."""
+    global _current
+    _current = Metrics(script, profile)
+    return _current
+
+
+def current():
+    return _current
+
+
+def count(name, value=1):
+    _current.count(name, value)
+
+
+def observe(name, ms):
+    _current.observe(name, ms)
+
+
+def span(name):
+    return _current.span(name)
+
+
+def stage(name):
+    return _current.stage(name)
+
+
+def parse_profile(value):
+    """Parse a ``--profile`` option (comma-separated stage names) into a set."""
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
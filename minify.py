@@ -0,0 +1,204 @@
+import re
+
+# Configuration
+# HTML elements whose contents are not collapsed like markup
+RAW_ELEMENTS = ("script", "style", "pre", "textarea")
+# A "/" after one of these (or at the start) opens a regex literal, not a division
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "delete", "throw")
+# Spaces next to these characters can always be dropped from JS
+JS_PUNCTUATION = set("{}()[];,:?=<>!&|")
+# Line breaks after or before these are never needed by automatic semicolon insertion
+JS_OPENERS = set("{[(,;:")
+JS_CLOSERS = set("}])")
+
+
+def collapse(whitespace):
+    """One newline for a run that had one, else one space."""
+    return "\n" if "\n" in whitespace else " "
+
+
+def minify_css(css):
+    """Strip comments and the whitespace CSS does not need; strings are kept as is."""
+    out = []
+    for n, part in enumerate(re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", css)):
+        if n % 2:
+            out.append(part)
+            continue
+        part = re.sub(r"/\*.*?\*/", "", part, flags=re.S)
+        part = re.sub(r"\s+", " ", part)
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        part = re.sub(r":\s+", ":", part)
+        out.append(part.replace(";}", "}"))
+    return "".join(out).strip()
+
+
+class _JsScanner:
+    """Copy JS source while dropping comments and redundant whitespace.
+
+    Strings, template literals (with nested `${...}` code) and regex
+    literals are copied verbatim. Line breaks are kept wherever automatic
+    semicolon insertion could depend on them, so the result parses the
+    same way as the source.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.pos = 0
+        self.out = []
+
+    def last(self):
+        """The last non-space character written, or ""."""
+        for chunk in reversed(self.out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped[-1]
+        return ""
+
+    def regex_allowed(self):
+        last = self.last()
+        if not last or last in REGEX_PRECEDERS:
+            return True
+        tail = "".join(self.out[-12:]).rstrip()
+        return any(re.search(rf"(?<![\w$]){word}$", tail) for word in REGEX_KEYWORDS)
+
+    def copy_quoted(self, quote):
+        end = self.pos + 1
+        while end < len(self.source) and self.source[end] != quote:
+            end += 2 if self.source[end] == "\\" else 1
+        self.out.append(self.source[self.pos:end + 1])
+        self.pos = end + 1
+
+    def copy_template(self):
+        start = self.pos
+        self.pos += 1
+        while self.pos < len(self.source):
+            c = self.source[self.pos]
+            if c == "\\":
+                self.pos += 2
+            elif c == "`":
+                self.pos += 1
+                break
+            elif self.source.startswith("${", self.pos):
+                self.out.append(self.source[start:self.pos + 2])
+                self.pos += 2
+                self.scan(closing="}")
+                start = self.pos
+                continue
+            else:
+                self.pos += 1
+        self.out.append(self.source[start:self.pos])
+
+    def copy_regex(self):
+        end = self.pos + 1
+        in_class = False
+        while end < len(self.source):
+            c = self.source[end]
+            if c == "\\":
+                end += 2
+                continue
+            if c == "[":
+                in_class = True
+            elif c == "]":
+                in_class = False
+            elif c == "/" and not in_class:
+                break
+            elif c == "\n":
+                break
+            end += 1
+        end += 1
+        while end < len(self.source) and self.source[end].isalpha():
+            end += 1
+        self.out.append(self.source[self.pos:end])
+        self.pos = end
+
+    def space(self, whitespace):
+        """Write the shortest whitespace that keeps the code meaning the same."""
+        if self.out and self.out[-1] in (" ", "\n"):
+            if self.out[-1] == "\n" or "\n" not in whitespace:
+                return
+            self.out.pop()
+        last = self.last()
+        following = self.source[self.pos:self.pos + 1]
+        if not last or not following:
+            return
+        if "\n" in whitespace and last not in JS_OPENERS and following not in JS_CLOSERS:
+            self.out.append("\n")
+        elif last not in JS_PUNCTUATION and following not in JS_PUNCTUATION:
+            self.out.append(" ")
+
+    def scan(self, closing=None):
+        """Copy code up to the `closing` brace of a template substitution, or to the end."""
+        depth = 0
+        source = self.source
+        while self.pos < len(source):
+            c = source[self.pos]
+            if c in "'\"":
+                self.copy_quoted(c)
+            elif c == "`":
+                self.copy_template()
+            elif source.startswith("//", self.pos):
+                end = source.find("\n", self.pos)
+                self.pos = len(source) if end < 0 else end
+            elif source.startswith("/*", self.pos):
+                end = source.find("*/", self.pos + 2)
+                comment = source[self.pos:len(source) if end < 0 else end + 2]
+                self.pos += len(comment)
+                self.space(collapse(comment) if "\n" in comment else " ")
+            elif c == "/" and self.regex_allowed():
+                self.copy_regex()
+            elif c.isspace():
+                end = self.pos
+                while end < len(source) and source[end].isspace():
+                    end += 1
+                whitespace = source[self.pos:end]
+                self.pos = end
+                self.space(whitespace)
+            else:
+                if c == "{":
+                    depth += 1
+                elif c == "}":
+                    if closing and depth == 0:
+                        self.out.append(c)
+                        self.pos += 1
+                        return
+                    depth -= 1
+                self.out.append(c)
+                self.pos += 1
+
+
+def minify_js(source):
+    """Strip comments, indentation and blank lines from JS source."""
+    scanner = _JsScanner(source)
+    scanner.scan()
+    return "".join(scanner.out).strip()
+
+
+def minify_html(html):
+    """Minify a page: drop comments and collapse whitespace between markup.
+
+    Inline scripts and styles are minified with minify_js and minify_css;
+    <pre> and <textarea> contents are left alone. Every whitespace run
+    keeps one character, so inline elements stay separated as before.
+    """
+    pattern = re.compile(rf"(<({'|'.join(RAW_ELEMENTS)})\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+    out = []
+    pos = 0
+    for match in pattern.finditer(html):
+        out.append(minify_markup(html[pos:match.start()]))
+        open_tag, name, body, close_tag = match.groups()
+        name = name.lower()
+        if name == "style":
+            body = minify_css(body)
+        elif name == "script" and not re.search(r"\bsrc=", open_tag) and (
+                "type=" not in open_tag or re.search(r"type=[\"']?(text/javascript|module)", open_tag)):
+            body = minify_js(body)
+        out.append(minify_markup(open_tag) + body + close_tag)
+        pos = match.end()
+    out.append(minify_markup(html[pos:]))
+    return "".join(out).strip() + "\n"
+
+
+def minify_markup(markup):
+    markup = re.sub(r"<!--(?!\[if).*?-->", "", markup, flags=re.S)
+    return re.sub(r"\s+", lambda m: collapse(m.group()), markup)
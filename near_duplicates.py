@@ -0,0 +1,299 @@
+import argparse
+import glob
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import quote
+
+import build_boutique
+from catalog import load_products, product_key
+from image_store import ImageStore
+from thumbnails import find_sources
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is only needed to hash new images, not to read the report
+    Image = None
+
+# Configuration
+CACHE_FILE = ".phash_cache.json"
+REPORT_FILE = "near_duplicates.json"
+MERGED_FOLDER = "duplicates"   # Merged-away files are moved here, not deleted
+HASH_SIZE = 16                 # dHash grid: HASH_SIZE x HASH_SIZE bits
+THRESHOLD = 12                 # Largest Hamming distance still called a duplicate
+# Pages rebuilt from the image store, so their links do not pin a file
+GENERATED_PAGES = {"gallery.html"}
+# Pages whose card block build_boutique.py rebuilds from its folders; only the rest of them pins files
+BOUTIQUE_PAGES = set(build_boutique.PAGES)
+
+
+def dhash(source):
+    """Compute the difference hash of one image. Runs in a worker process.
+
+    The image is shrunk to (HASH_SIZE + 1) x HASH_SIZE greyscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour,
+    so re-encoding, resizing and small colour shifts barely change it.
+    """
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        small = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = small.load()
+    value = 0
+    for y in range(HASH_SIZE):
+        for x in range(HASH_SIZE):
+            value = (value << 1) | (pixels[x, y] > pixels[x + 1, y])
+
+    stat = os.stat(source)
+    return {
+        "hash": f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}",
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "width": width,
+        "height": height,
+    }
+
+
+def hamming(a, b):
+    """Number of differing bits between two integer hashes."""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes under Hamming distance.
+
+    Each child edge is labelled with its distance to the parent, so a
+    radius query only descends into children whose label is within the
+    radius of the query's distance to the node (triangle inequality),
+    instead of comparing against every hash.
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        """Return `(distance, item)` for every item within `radius` of `value`."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for label, child in node[2].items():
+                if distance - radius <= label <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def page_references(pattern="*.html"):
+    """Return the text of the site's hand-written pages, to spot linked files."""
+    pages = {}
+    for path in sorted(glob.glob(pattern)):
+        if path in GENERATED_PAGES:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if path in BOUTIQUE_PAGES:
+            text = without_cards(text)
+        pages[path] = text
+    return pages
+
+
+def without_cards(text):
+    """Cut the block build_boutique.py generates out of a page's text."""
+    start = text.find(build_boutique.START_MARKER)
+    end = text.find(build_boutique.END_MARKER, start)
+    if start < 0 or end < 0:
+        return text
+    return text[:start] + text[end:]
+
+
+def referencing_pages(source, pages):
+    """Return the pages linking to `source`, written plainly, HTML-escaped or URL-quoted."""
+    spellings = {source, html.escape(source), html.escape(source, quote=False), quote(source)}
+    return [page for page, text in pages.items() if any(spelling in text for spelling in spellings)]
+
+
+def find_groups(entries, pages, threshold=THRESHOLD):
+    """Group each image with the near-duplicates it should replace.
+
+    Images are taken best first: one a page links to, then the one with the
+    most pixels, then the largest file. Each image not yet grouped keeps
+    every ungrouped image within `threshold` of it, so no duplicate is
+    further than that from the image that replaces it.
+    """
+    tree = BKTree()
+    for source, entry in entries.items():
+        tree.add(int(entry["hash"], 16), source)
+
+    linked = {source for source in entries if referencing_pages(source, pages)}
+
+    def rank(source):
+        entry = entries[source]
+        return (source in linked, entry["width"] * entry["height"], entry["size"])
+
+    grouped = set()
+    groups = []
+    for keep in sorted(sorted(entries), key=rank, reverse=True):
+        if keep in grouped:
+            continue
+        grouped.add(keep)
+        found = tree.search(int(entries[keep]["hash"], 16), threshold)
+        matches = sorted((distance, source) for distance, source in found if source not in grouped)
+        if matches:
+            grouped.update(source for _, source in matches)
+            groups.append({
+                "keep": keep,
+                "duplicates": [{"path": source, "distance": distance} for distance, source in matches],
+            })
+    return groups
+
+
+def merge(report, pages):
+    """Move duplicates into MERGED_FOLDER and point the image store at the keeper.
+
+    Row-numbered product images (images/0001_*) and store blobs are relinked
+    in the image store manifest; files moved out of the boutique folders
+    drop out of the boutique pages when build_boutique.py runs. Files a
+    hand-written page links to by name are left in place. Returns
+    `(moved, kept)`.
+    """
+    store = ImageStore()
+    # Row-numbered files belong to the product on that CSV row
+    keys = {f"{n:04d}": product_key(product, n) for n, product in enumerate(load_products(), 1)}
+    moved = kept = 0
+    for group in report["groups"]:
+        keep = group["keep"]
+        for duplicate in group["duplicates"]:
+            source = duplicate["path"]
+            linked_from = referencing_pages(source, pages)
+            if linked_from:
+                duplicate["kept"] = f"linked from {', '.join(linked_from)}"
+                kept += 1
+                continue
+
+            for mapping in (store.urls, store.products):
+                for key, blob in mapping.items():
+                    if blob == source:
+                        mapping[key] = keep
+            folder, name = os.path.split(source)
+            prefix, sep, _ = name.partition("_")
+            key = keys.get(prefix)
+            if folder == "images" and sep and key and key not in store.products:
+                store.link_product(key, keep)
+
+            target = os.path.join(MERGED_FOLDER, source)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(source, target)
+            duplicate["moved_to"] = target.replace(os.sep, "/")
+            moved += 1
+    store.save()
+    return moved, kept
+
+
+def load_cache(cache_file=CACHE_FILE):
+    """Load cached hashes (source path -> entry), or {} if missing."""
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_current(entry, source):
+    """True if `entry` was computed from the current contents of `source`."""
+    if not entry or len(entry["hash"]) != HASH_SIZE * HASH_SIZE // 4:
+        return False
+    stat = os.stat(source)
+    return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns
+
+
+def main(workers=None, threshold=THRESHOLD, apply=False):
+    cache = load_cache()
+    sources = find_sources()
+    pending = [source for source in sources if not is_current(cache.get(source), source)]
+    if pending and Image is None:
+        print("Pillow is required to hash images: pip install Pillow")
+        return
+
+    print(f"Found {len(sources)} images, {len(pending)} need hashing")
+    print("=" * 50)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(dhash, source): source for source in pending}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                cache[source] = future.result()
+            except Exception as e:
+                print(f"{source} - Error: {e}")
+                failed += 1
+
+    # Forget sources that no longer exist
+    cache = {source: cache[source] for source in sources if source in cache}
+    tmp_file = CACHE_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, CACHE_FILE)
+
+    pages = page_references()
+    report = {"threshold": threshold, "groups": find_groups(cache, pages, threshold)}
+    for group in report["groups"]:
+        print(f"{group['keep']}")
+        for duplicate in group["duplicates"]:
+            print(f"  ~ {duplicate['path']} (distance {duplicate['distance']})")
+
+    if apply:
+        moved, kept = merge(report, pages)
+        boutique = [
+            duplicate for group in report["groups"] for duplicate in group["duplicates"]
+            if "moved_to" in duplicate and duplicate["path"].split("/")[0] in build_boutique.FOLDERS
+        ]
+        if boutique:
+            print("=" * 50)
+            build_boutique.main()
+
+    tmp_file = REPORT_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_file, REPORT_FILE)
+
+    print("=" * 50)
+    print(f"Groups: {len(report['groups'])}")
+    print(f"Duplicates: {sum(len(group['duplicates']) for group in report['groups'])}")
+    if apply:
+        print(f"Moved to {MERGED_FOLDER}/: {moved}")
+        print(f"Kept (linked from a page): {kept}")
+        print("Run generate_gallery.py to pick up the relinked images.")
+    print(f"Failed: {failed}")
+    print(f"Report saved to: {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate images with perceptual hashes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--threshold", type=int, default=THRESHOLD,
+                        help=f"largest Hamming distance (out of {HASH_SIZE * HASH_SIZE} bits) counted as a duplicate")
+    parser.add_argument("--merge", action="store_true",
+                        help=f"move duplicates to {MERGED_FOLDER}/ and relink products to the kept image")
+    args = parser.parse_args()
+    main(workers=args.workers, threshold=args.threshold, apply=args.merge)
@@ -0,0 +1,264 @@
+import argparse
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from http_cache import HttpCache
+from image_store import EXTENSIONS, STORE_FOLDER, ImageStore, file_digest, image_format
+from thumbnails import IMAGE_EXTENSIONS, SOURCE_FOLDERS, find_sources
+
+try:
+    from PIL import Image, ImageChops, ImageStat
+except ImportError:  # Pillow is needed to re-encode; main() says so
+    Image = None
+
+# Configuration
+CACHE_FILE = ".optimize_cache.json"
+MAX_ERROR = 1.0        # Largest mean per-channel pixel difference (0-255) a re-encode may add
+ORIENTATION = 0x0112   # The one EXIF tag kept: dropping it would turn photos on their side
+# Formats re-encoded here; GIF (animation) and WebP/AVIF (lossy) are only validated
+REENCODE = ("jpeg", "png")
+
+
+def encode(img, fmt):
+    """Re-encode an opened image without its metadata; returns the new bytes.
+
+    JPEGs keep their quantisation tables and chroma subsampling, so only
+    rounding changes, and are written progressive with optimised Huffman
+    tables. PNGs are recompressed losslessly. The ICC colour profile is
+    kept; EXIF, XMP, comments and text chunks are dropped.
+    """
+    options = {}
+    if img.info.get("icc_profile"):
+        options["icc_profile"] = img.info["icc_profile"]
+    orientation = img.getexif().get(ORIENTATION)
+    if orientation and orientation != 1:
+        exif = Image.Exif()
+        exif[ORIENTATION] = orientation
+        options["exif"] = exif.tobytes()
+    if fmt == "jpeg":
+        options.update(quality="keep", subsampling="keep", optimize=True, progressive=True)
+    else:
+        options.update(optimize=True)
+        if "transparency" in img.info:
+            options["transparency"] = img.info["transparency"]
+    out = io.BytesIO()
+    img.save(out, format=fmt.upper(), **options)
+    return out.getvalue()
+
+
+def difference(img, data):
+    """Mean per-channel pixel difference between `img` and the encoded `data`."""
+    with Image.open(io.BytesIO(data)) as encoded:
+        mode = "RGBA" if img.mode in ("RGBA", "LA", "PA", "P") else "RGB"
+        return max(ImageStat.Stat(ImageChops.difference(img.convert(mode), encoded.convert(mode))).mean)
+
+
+def in_store(path):
+    """True for blobs of the image store, which are named after their content."""
+    return path.startswith(STORE_FOLDER.replace(os.sep, "/") + "/")
+
+
+def optimize(path, output=None):
+    """Validate one image and replace it with a smaller re-encoding. Runs in a worker process.
+
+    With `output`, the re-encoding is written there and `path` is left
+    alone. Returns a result dict whose "status" is "invalid" (not a
+    readable image), "kept" (the file was already as small as we can make
+    it) or "optimized".
+    """
+    before = os.path.getsize(path)
+    result = {"path": path, "before": before, "after": before, "format": image_format(path)}
+    if result["format"] is None:
+        return dict(result, status="invalid", reason="not an image")
+    try:
+        with Image.open(path) as img:
+            img.verify()   # Checks the structure...
+        img = Image.open(path)
+        img.load()         # ...and decoding every pixel catches truncated files
+    except Exception as e:
+        return dict(result, status="invalid", reason=str(e))
+
+    data = None
+    with img:
+        if result["format"] in REENCODE:
+            data = encode(img, result["format"])
+            if len(data) >= before or difference(img, data) > MAX_ERROR:
+                data = None
+    if data is None:
+        return dict(result, status="kept", digest=file_digest(path))
+
+    output = output or path
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, output)
+    return dict(result, status="optimized", after=len(data), digest=file_digest(output))
+
+
+def link_duplicate(source, target):
+    """Replace `target` (identical content) with a hard link to `source`, or a copy.
+
+    Returns True if it was linked.
+    """
+    tmp_path = target + ".tmp"
+    try:
+        os.link(source, tmp_path)
+        linked = True
+    except OSError:
+        shutil.copy2(source, tmp_path)
+        linked = False
+    os.replace(tmp_path, target)
+    return linked
+
+
+def load_cache():
+    """Load the optimisation cache: file stats -> digest, and the digests already done."""
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache["files"], set(cache["done"])
+    return {}, set()
+
+
+def save_cache(files, done):
+    tmp_file = CACHE_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"files": files, "done": sorted(done)}, f, indent=1, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_file, CACHE_FILE)
+
+
+def digest_of(path, files):
+    """Return the content digest of `path`, reusing the cached one while size and mtime match."""
+    stat = os.stat(path)
+    cached = files.get(path)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = file_digest(path)
+    files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+
+def remember(path, digest, files):
+    stat = os.stat(path)
+    files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+
+
+def main(workers=None, link=True):
+    if Image is None:
+        print("Pillow is required to optimize images: pip install Pillow")
+        return
+
+    files, done = load_cache()
+    store = ImageStore()
+    cache = HttpCache()
+    sources = find_sources()
+    # One job per distinct content: identical files are processed once and share the result
+    groups = {}
+    for source in sources:
+        digest = digest_of(source, files)
+        if digest not in done:
+            groups.setdefault(digest, []).append(source)
+
+    print(f"Found {len(sources)} images in {', '.join(SOURCE_FOLDERS)}, "
+          f"{sum(map(len, groups.values()))} to check ({len(groups)} distinct)")
+    print("=" * 50)
+
+    counts = {"optimized": 0, "kept": 0, "invalid": 0, "linked": 0, "failed": 0}
+    saved = 0
+    misnamed = 0
+    restored = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Blobs are named after their content, so their re-encoding goes to a new file
+        futures = {}
+        for paths in groups.values():
+            paths.sort(key=in_store)   # Rewrite a plain file in place when the group has one
+            output = store.temp_path() if in_store(paths[0]) else None
+            futures[executor.submit(optimize, paths[0], output)] = (paths, output)
+        for n, future in enumerate(as_completed(futures), 1):
+            paths, output = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[{n}/{len(groups)}] {paths[0]} - Error: {e}")
+                counts["failed"] += 1
+                if output and os.path.exists(output):
+                    os.remove(output)
+                continue
+            status = result["status"]
+            if output and status != "optimized":
+                os.remove(output)
+                output = None
+            optimized = output or paths[0]
+            counts[status] += 1
+            if status == "invalid":
+                print(f"[{n}/{len(groups)}] {paths[0]} INVALID ({result['reason']})")
+                continue
+            if status == "optimized":
+                saved += result["before"] - result["after"]
+                print(f"[{n}/{len(groups)}] {paths[0]} {result['before']:,} -> {result['after']:,} bytes")
+            else:
+                print(f"[{n}/{len(groups)}] {paths[0]} OK")
+            done.add(result["digest"])
+            for path in paths:
+                if in_store(path):
+                    if status == "optimized":
+                        # Re-add the new content and repoint the manifest and HTTP cache at it
+                        tmp_path = store.temp_path()
+                        shutil.copyfile(optimized, tmp_path)
+                        blob = store.replace_blob(path, tmp_path)
+                        cache.replace_blob(path, blob)
+                        remember(blob, result["digest"], files)
+                        restored += 1
+                        if path != paths[0]:
+                            saved += result["before"] - result["after"]
+                    continue
+                if path == paths[0]:
+                    remember(path, result["digest"], files)
+                elif link and link_duplicate(paths[0], path):
+                    counts["linked"] += 1
+                    saved += result["before"]   # Its blocks are now shared
+                    remember(path, result["digest"], files)
+                else:
+                    if status == "optimized":
+                        shutil.copyfile(paths[0], path)
+                        saved += result["before"] - result["after"]
+                    remember(path, result["digest"], files)
+            if output:
+                os.remove(output)
+            extension = os.path.splitext(paths[0])[1].lower().replace(".jpeg", ".jpg")
+            if extension != EXTENSIONS[result["format"]]:
+                misnamed += len(paths)
+
+    # Forget files that no longer exist
+    files = {path: entry for path, entry in files.items() if os.path.exists(path)}
+    save_cache(files, done)
+    if restored:
+        store.save()
+        cache.save()
+
+    print("=" * 50)
+    print(f"Optimized: {counts['optimized']}")
+    print(f"Already optimal: {counts['kept']}")
+    print(f"Duplicates linked: {counts['linked']}")
+    print(f"Invalid: {counts['invalid']}")
+    print(f"Failed: {counts['failed']}")
+    if misnamed:
+        print(f"Extension does not match the content: {misnamed} (kept, browsers sniff the type)")
+    print(f"Saved: {saved / 2**20:.1f} MiB")
+    if restored:
+        print(f"Stored {restored} re-encoded blob(s) under new names: rebuild the thumbnails and the gallery")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Validate the site images ({', '.join(IMAGE_EXTENSIONS)}), strip their metadata "
+                    "and re-encode them progressive without visible loss")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--no-link", dest="link", action="store_false",
+                        help="keep identical images as separate files instead of hard-linking them")
+    args = parser.parse_args()
+    main(workers=args.workers, link=args.link)
@@ -0,0 +1,155 @@
+import argparse
+import os
+import queue
+import threading
+import time
+
+import metrics
+import scraper
+from catalog import Catalog, product_key
+from download_images import (
+    MAX_WORKERS, RATE_LIMIT, HostRateLimiter, create_session, fetch_into_store, get_extension, positive,
+)
+from http_cache import HttpCache
+from image_store import ImageStore, canonical_url
+
+# Configuration
+OUTPUT_FILE = scraper.OUTPUT_FILE
+QUEUE_SIZE = 200   # Products scraped but not yet downloaded before scraping blocks
+
+
+class Downloader:
+    """Download workers fed from a bounded queue of scraped products.
+
+    Rows sharing a canonical image URL are fetched once: the first worker to
+    see the URL downloads it, the others wait for and link its blob.
+    """
+
+    def __init__(self, workers=MAX_WORKERS, rate=RATE_LIMIT, queue_size=QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.store = ImageStore()
+        self.cache = HttpCache()
+        self.session = create_session(workers)
+        self.limiter = HostRateLimiter(rate=rate)
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.counts = {"downloaded": 0, "failed": 0}
+        self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def put(self, key, title, image_url):
+        """Queue one product; blocks while the queue is full."""
+        self.queue.put((key, title, image_url))
+
+    def work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            key, title, image_url = item
+
+            with self.lock:
+                slot = self.slots.get(canonical_url(image_url))
+                owner = slot is None
+                if owner:
+                    slot = self.slots[canonical_url(image_url)] = {"done": threading.Event(), "blob": None}
+
+            if owner:
+                # Waiters must be released even if the fetch raises; the blob then stays None
+                try:
+                    blob = self.store.lookup(image_url)
+                    if not blob:
+                        blob, _ = fetch_into_store(self.store, image_url, get_extension(image_url),
+                                                   self.session, self.limiter, self.cache)
+                    slot["blob"] = blob
+                except Exception as e:
+                    print(f"  [{key}] {title[:40]}... Error: {e}")
+                finally:
+                    slot["done"].set()
+            else:
+                slot["done"].wait()
+
+            with self.lock:
+                if slot["blob"]:
+                    self.store.link_product(key, slot["blob"])
+                    self.counts["downloaded"] += 1
+                else:
+                    print(f"  [{key}] {title[:40]}... FAILED")
+                    self.counts["failed"] += 1
+
+    def close(self):
+        """Wait for queued products to finish, then save the store."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.session.close()
+        self.store.save()
+        self.cache.save()
+
+
+def main(scrape_workers=scraper.MAX_DRIVERS, download_workers=MAX_WORKERS, rate=RATE_LIMIT,
+         base_url=scraper.BASE_URL, headless=True, resume=False, profile=()):
+    run = metrics.start("pipeline", profile)
+    print("Scrape -> download pipeline")
+    print("=" * 50)
+    start = time.monotonic()
+
+    downloader = Downloader(workers=download_workers, rate=rate)
+    # Products are collected as pages arrive; the catalog is written only once the crawl ends
+    products = []
+    skipped = 0
+
+    def on_page(page, found):
+        nonlocal skipped
+        for product in found:
+            products.append(product)
+            if product["image"] and product["image"] != "N/A":
+                downloader.put(product_key(product, len(products)), product["title"], product["image"])
+            else:
+                skipped += 1
+
+    # Downloads overlap the crawl, so one stage covers both; the spans tell them apart
+    with metrics.stage("crawl"):
+        try:
+            scraper.scrape_with_selenium(headless=headless, workers=scrape_workers,
+                                         base_url=base_url, on_page=on_page, resume=resume)
+        finally:
+            downloader.close()
+
+    if products:
+        with metrics.stage("save"), Catalog() as catalog:
+            changed, removed = catalog.sync(products)
+            catalog.export_csv(OUTPUT_FILE)
+        print(f"Catalog updated: {changed} changed, {removed} removed")
+        print(f"Saved {len(products)} products to {OUTPUT_FILE}")
+    else:
+        print("\nNo products scraped.")
+
+    print("=" * 50)
+    print(f"Downloaded: {downloader.counts['downloaded']}")
+    print(f"Skipped: {skipped}")
+    print(f"Failed: {downloader.counts['failed']}")
+    print(f"Time: {time.monotonic() - start:.1f}s")
+    print(run.report())
+    print(f"Metrics saved to: {run.save()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape products and download their images concurrently")
+    parser.add_argument("--scrape-workers", type=int, default=scraper.MAX_DRIVERS,
+                        help="number of browsers scraping pages in parallel")
+    parser.add_argument("--download-workers", type=positive(int), default=MAX_WORKERS,
+                        help="number of concurrent image downloads")
+    parser.add_argument("--rate", type=positive(float), default=RATE_LIMIT,
+                        help="maximum image requests per second to any single host")
+    parser.add_argument("--base-url", default=scraper.BASE_URL,
+                        help="collection URL to crawl")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted crawl from the scraper's journal")
+    parser.add_argument("--profile", metavar="STAGES", type=metrics.parse_profile, default=set(),
+                        help="run these comma-separated stages (crawl, save or all) under cProfile")
+    args = parser.parse_args()
+    main(scrape_workers=args.scrape_workers, download_workers=args.download_workers,
+         rate=args.rate, base_url=args.base_url, resume=args.resume, profile=args.profile)
@@ -1,16 +1,15 @@
-import csv
+import os
 
-# Read the CSV file
-rows = []
-with open('products.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    rows = list(reader)
+from catalog import CATALOG_FILE, Catalog
 
-# Write back without the price column
-with open('products.csv', 'w', newline='', encoding='utf-8') as f:
-    writer = csv.DictWriter(f, fieldnames=['title', 'image'])
-    writer.writeheader()
-    for row in rows:
-        writer.writerow({'title': row['title'], 'image': row['image']})
+# products.csv goes through the catalog: the import keeps only the title,
+# image and handle columns, and the export rewrites the CSV atomically from it
+created = not os.path.exists(CATALOG_FILE)
+with Catalog() as catalog:
+    changed, removed = catalog.import_csv('products.csv')
+    catalog.export_csv('products.csv')
 
+if created:
+    print(f"Created {CATALOG_FILE}")
 print("Prices removed from products.csv")
+print(f"Catalog updated: {changed} changed, {removed} removed")
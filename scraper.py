@@ -1,7 +1,19 @@
-import csv
+import argparse
+import json
+import os
+import queue
+import threading
 import time
 import random
-from bs4 import BeautifulSoup
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+from bs4 import BeautifulSoup, Tag
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # Fall back to BeautifulSoup's pure-Python html.parser
+    lxml_etree = None
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -10,11 +22,29 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+import metrics
+from catalog import Catalog
+
 
 # Configuration
 BASE_URL = "https://shop.mayvenn.com/collections"
 MAX_PAGES = 10
 OUTPUT_FILE = "products.csv"
+MAX_DRIVERS = 3            # Browsers scraping collection pages in parallel
+PAGE_DELAY = (2, 4)        # Seconds each browser waits between its requests
+SETTLE_INTERVAL = 0.5      # Poll period while waiting for the product count to settle
+PAGE_RETRIES = 3           # Attempts per page before it is recorded as failed
+RETRY_BACKOFF = 5          # Seconds before a retry, multiplied by the attempt number
+JOURNAL_FILE = "crawl_journal.jsonl"
+
+
+@lru_cache(maxsize=None)
+def get_driver_path():
+    """Return the chromedriver binary, resolving it once per process.
+
+    Set CHROMEDRIVER_PATH to skip webdriver-manager's version check entirely.
+    """
+    return os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
 
 
 def create_driver(headless=True, proxy=None):
@@ -33,211 +63,582 @@ def create_driver(headless=True, proxy=None):
     if proxy:
         options.add_argument(f"--proxy-server={proxy}")
 
-    service = Service(ChromeDriverManager().install())
+    service = Service(get_driver_path())
     driver = webdriver.Chrome(service=service, options=options)
 
     return driver
 
 
+class DriverPool:
+    """A fixed set of WebDriver instances shared by scraping threads."""
+
+    def __init__(self, size=MAX_DRIVERS, headless=True, proxy=None):
+        self.size = size
+        self.headless = headless
+        self.proxy = proxy
+        self.drivers = []
+        self.broken = set()
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, starting a new browser while under `size`."""
+        try:
+            driver = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                start_new = len(self.drivers) < self.size
+                if start_new:
+                    self.drivers.append(None)  # Reserve the slot while Chrome starts
+            if start_new:
+                try:
+                    driver = create_driver(headless=self.headless, proxy=self.proxy)
+                finally:
+                    with self.lock:
+                        self.drivers.remove(None)
+                with self.lock:
+                    self.drivers.append(driver)
+            else:
+                driver = self.idle.get()
+        try:
+            yield driver
+        finally:
+            if id(driver) in self.broken:
+                self._drop(driver)
+            else:
+                self.idle.put(driver)
+
+    def discard(self, driver):
+        """Mark a borrowed driver as unusable; it is quit when returned."""
+        self.broken.add(id(driver))
+
+    def _drop(self, driver):
+        with self.lock:
+            self.broken.discard(id(driver))
+            self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every browser started by the pool."""
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        self.drivers = []
+
+
+class CrawlJournal:
+    """Append-only JSON-lines checkpoint of finished collection pages.
+
+    The first line records the crawled base URL; each later line holds one
+    page's outcome and extracted products. Resuming replays completed pages
+    from the journal instead of fetching them again; failed pages are
+    retried.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, base_url=BASE_URL, resume=False):
+        self.path = path
+        self.pages = {}
+        if resume and os.path.exists(path):
+            self._load(base_url)
+        if not self.pages:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"base_url": base_url}) + "\n")
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _load(self, base_url):
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("base_url") != base_url:
+            print(f"Ignoring {self.path}: it was written for another crawl.")
+            return
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by a crash
+            if entry.get("status") == "done":
+                self.pages[entry["page"]] = (entry["products"], entry["has_next"])
+            else:
+                self.pages.pop(entry.get("page"), None)
+
+    def completed(self, page):
+        """Return `(products, has_next)` for a page finished earlier, or None."""
+        return self.pages.get(page)
+
+    def record(self, page, products, has_next):
+        """Append a page's outcome; `products` is None for a failed page."""
+        entry = {"page": page, "time": time.time()}
+        if products is None:
+            entry["status"] = "failed"
+        else:
+            entry.update(status="done", products=products, has_next=has_next)
+            self.pages[page] = (products, has_next)
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def wait_for_products(driver, wait_time=5, interval=SETTLE_INTERVAL):
+    """Wait until product links appear and their count stops changing."""
+    selector = (By.CSS_SELECTOR, "a[href*='/products/']")
+    WebDriverWait(driver, wait_time).until(EC.presence_of_element_located(selector))
+
+    deadline = time.monotonic() + wait_time
+    count = len(driver.find_elements(*selector))
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        current = len(driver.find_elements(*selector))
+        if current == count:
+            return count
+        count = current
+    return count
+
+
 def fetch_page_selenium(driver, url, wait_time=5):
     """Fetch a page using Selenium and wait for content to load."""
     try:
-        driver.get(url)
-        # Wait for product elements to load
-        WebDriverWait(driver, wait_time).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/products/']"))
-        )
-        # Extra wait for prices to render
-        time.sleep(2)
-        return driver.page_source
+        with metrics.span("page.load"):
+            driver.get(url)
+        # Wait for lazily rendered products to finish appearing
+        with metrics.span("page.wait"):
+            wait_for_products(driver, wait_time)
+        html = driver.page_source
+        metrics.count("bytes.html", len(html.encode("utf-8")))
+        return html
     except Exception as e:
+        metrics.count(f"page.errors.{type(e).__name__}")
         print(f"Error fetching {url}: {e}")
         return None
 
 
-def parse_products(soup):
-    """Parse product items from the page."""
-    products = []
-    seen_titles = set()
-
-    # Find all product cards/containers
-    product_containers = soup.select(
-        ".product-card, .product-item, .grid__item, "
-        "[class*='product'], [data-product]"
-    )
-
-    if product_containers:
-        for container in product_containers:
-            # Find product link
-            link = container.select_one("a[href*='/products/']")
-            if not link:
-                continue
+def parse_html(html):
+    """Parse page HTML with lxml (C-backed) when installed, else html.parser."""
+    if lxml_etree is not None:
+        return lxml_etree.HTML(html)
+    return BeautifulSoup(html, "html.parser")
 
-            title = link.get("title") or link.get_text(strip=True)
-            if not title or title in seen_titles or len(title) < 3:
-                continue
 
-            seen_titles.add(title)
-
-            # Find price - try multiple selectors
-            
-            
-            # Find image URL
-            image_url = "N/A"
-            img_selectors = [
-                "img[src*='/products/']", "img[src*='/files/']",
-                "img[data-src]", "img.product-image", "img"
-            ]
-            for selector in img_selectors:
-                img_el = container.select_one(selector)
-                if img_el:
-                    # Try different attributes for image URL
-                    img_src = (
-                        img_el.get("src") or
-                        img_el.get("data-src") or
-                        img_el.get("data-srcset", "").split()[0] or
-                        img_el.get("srcset", "").split()[0]
-                    )
-                    if img_src and len(img_src) > 5:
-                        # Clean up URL
-                        if img_src.startswith("//"):
-                            img_src = "https:" + img_src
-                        # Get higher resolution image
-                        if "width=" in img_src:
-                            img_src = img_src.split("&width=")[0] + "&width=500"
-                        image_url = img_src
-                        break
-
-            products.append({"title": title, "image": image_url})
+def _walk(root):
+    """Yield ("start"|"end", tag_name, element) for every element in order.
 
-    # Fallback: find products by links if no containers found
-    if not products:
-        product_links = soup.select("a[href*='/products/']")
+    lxml elements and BeautifulSoup tags both offer .get(attribute), which
+    is all the extraction below needs besides the tag name and text.
+    """
+    if isinstance(root, (str, bytes)):
+        root = parse_html(root)
+    if not isinstance(root, Tag):
+        for event, el in lxml_etree.iterwalk(root, events=("start", "end")):
+            if isinstance(el.tag, str):
+                yield event, el.tag, el
+        return
 
-        for link in product_links:
-            title = link.get("title") or link.get_text(strip=True)
-            if not title or title in seen_titles or len(title) < 3:
-                continue
+    stack = [(root, False)]
+    while stack:
+        tag, done = stack.pop()
+        if done:
+            yield "end", tag.name, tag
+            continue
+        yield "start", tag.name, tag
+        stack.append((tag, True))
+        stack.extend((child, False) for child in reversed(tag.find_all(True, recursive=False)))
 
-            seen_titles.add(title)
 
-            # Look for price in parent elements
-            price = "N/A"
-            image_url = "N/A"
-            parent = link.find_parent(["div", "li", "article", "section"])
-            if parent:
-                price_el = parent.find(string=lambda x: x and "$" in x)
-                if price_el:
-                    price = price_el.strip()
+def _classes(el):
+    """Return an element's class attribute as one string."""
+    value = el.get("class") or ""
+    return " ".join(value) if isinstance(value, list) else value
 
-                # Find image in parent
-                img_el = parent.select_one("img")
-                if img_el:
-                    img_src = img_el.get("src") or img_el.get("data-src")
-                    if img_src:
-                        if img_src.startswith("//"):
-                            img_src = "https:" + img_src
-                        image_url = img_src
 
-            products.append({"title": title, "price": price, "image": image_url})
+def _text(el):
+    """Return an element's text with whitespace collapsed."""
+    strings = el.stripped_strings if isinstance(el, Tag) else el.itertext()
+    return " ".join(" ".join(strings).split())
 
-    return products
 
+def _is_container(el):
+    """Match the old container selector (.product-card, .product-item,
+    .grid__item, [class*='product'], [data-product])."""
+    classes = _classes(el)
+    return "product" in classes or "grid__item" in classes.split() or el.get("data-product") is not None
 
-def has_next_page(soup, current_page):
-    """Check if there's a next page."""
-    # Look for next page link
-    next_page = current_page + 1
-    next_link = soup.select_one(f"a[href*='page={next_page}']")
-    if next_link:
-        return True
 
-    # Check for "Next" button
-    next_btn = soup.find("a", string=lambda x: x and "next" in x.lower() if x else False)
-    return next_btn is not None
+def _image_url(el):
+    """Return (priority, url) for an <img>, or None if it has no usable URL.
 
+    Priorities follow the old selector chain: src with /products/, src with
+    /files/, data-src, .product-image, then any image.
+    """
+    def first_url(value):
+        parts = (value or "").split()
+        return parts[0] if parts else None
 
-def save_to_csv(products, filename):
-    """Save products to a CSV file."""
-    if not products:
-        print("No products to save.")
-        return
+    src = el.get("src")
+    img_src = src or el.get("data-src") or first_url(el.get("data-srcset")) or first_url(el.get("srcset"))
+    if not img_src or len(img_src) <= 5:
+        return None
+
+    src = src or ""
+    if "/products/" in src:
+        priority = 0
+    elif "/files/" in src:
+        priority = 1
+    elif el.get("data-src") is not None:
+        priority = 2
+    elif "product-image" in _classes(el).split():
+        priority = 3
+    else:
+        priority = 4
+
+    # Clean up URL
+    if img_src.startswith("//"):
+        img_src = "https:" + img_src
+    # Get higher resolution image
+    if "width=" in img_src:
+        img_src = img_src.split("&width=")[0] + "&width=500"
+    return priority, img_src
+
+
+def product_handle(href):
+    """Return the `/products/<handle>` slug of a product link, or None.
+
+    The handle identifies a product across collection pages, whatever
+    collection path, query string or variant the link carries.
+    """
+    path = urlsplit(href).path
+    _, sep, rest = path.partition("/products/")
+    if not sep:
+        return None
+    return unquote(rest.split("/", 1)[0]).lower() or None
 
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["title", "image"])
-        writer.writeheader()
-        for product in products:
-            writer.writerow({"title": product["title"], "image": product["image"]})
 
-    print(f"Saved {len(products)} products to {filename}")
+def dedup_key(product):
+    """Stable identity of a scraped product: its handle, else its title."""
+    return product.get("handle") or product["title"]
 
 
-def scrape_with_selenium(headless=True):
-    """Main scraping function using Selenium."""
-    all_products = []
-    page = 1
+def _merge(record, other):
+    """Fold a nested container's findings into its parent's record."""
+    record["handles"].update(other["handles"])
+    record["links"].extend(other["links"])
+    if other["image"] and (not record["image"] or other["image"][0] < record["image"][0]):
+        record["image"] = other["image"]
 
-    print("Starting Selenium WebDriver...")
-    driver = create_driver(headless=headless)
 
-    try:
-        while page <= MAX_PAGES:
-            url = f"{BASE_URL}?page={page}"
-            print(f"\n{'='*50}")
-            print(f"Scraping page {page}: {url}")
-
-            html = fetch_page_selenium(driver, url)
-            if not html:
-                print("Failed to fetch page. Stopping.")
+def parse_products(page):
+    """Parse product items from the page.
+
+    `page` is raw HTML (parsed with lxml when available) or an already
+    parsed document. The tree is walked once: every product link and image
+    is attached to its innermost product container, and nested containers
+    are collapsed so each product is read from the largest container that
+    holds only that product's links (counted by handle, see `product_handle`).
+    """
+    products = []
+    seen = set()
+    stack = []
+    loose_links = []
+
+    def add(title, image_url, href):
+        product = {"title": title, "image": image_url, "handle": product_handle(href)}
+        key = dedup_key(product)
+        if key not in seen:
+            seen.add(key)
+            products.append(product)
+
+    def emit(record):
+        for href, title in record["links"]:
+            if title and len(title) >= 3:
                 break
+        else:
+            return
+        add(title, record["image"][1] if record["image"] else "N/A", href)
+
+    for event, name, el in _walk(page):
+        if event == "start":
+            if _is_container(el):
+                stack.append({"el": el, "handles": set(), "links": [], "image": None, "children": []})
+            if name == "a":
+                href = el.get("href") or ""
+                if "/products/" in href:
+                    if stack:
+                        # Links to one product differ by collection path and query string
+                        stack[-1]["handles"].add(product_handle(href) or href)
+                        stack[-1]["links"].append((href, el.get("title") or _text(el)))
+                    else:
+                        loose_links.append(el)
+            elif name == "img" and stack:
+                image = _image_url(el)
+                record = stack[-1]
+                if image and (not record["image"] or image[0] < record["image"][0]):
+                    record["image"] = image
+            continue
+
+        if not stack or stack[-1]["el"] is not el:
+            continue
+        record = stack.pop()
+        children = record.pop("children")
+        for child in children:
+            _merge(record, child)
+
+        if len(record["handles"]) > 1:
+            # A wrapper around several products: its single-product children are the cards
+            for child in children:
+                if len(child["handles"]) == 1:
+                    emit(child)
+            record["links"] = []
+            record["image"] = None
+        if stack:
+            stack[-1]["children"].append(record)
+        elif len(record["handles"]) == 1:
+            emit(record)
 
-            soup = BeautifulSoup(html, "html.parser")
-            products = parse_products(soup)
+    # Fallback: find products by links if no containers found
+    if not products:
+        for link in loose_links:
+            title = link.get("title") or _text(link)
+            if not title or len(title) < 3:
+                continue
+            add(title, _loose_link_image(link), link.get("href") or "")
 
-            if not products:
-                print("No products found on this page. Stopping.")
-                break
+    return products
 
-            all_products.extend(products)
-            print(f"Found {len(products)} products (Total: {len(all_products)})")
 
-            # Print first 5 products with image info
-            for p in products[:5]:
-                img_status = "[IMG]" if p['image'] != "N/A" else "[NO IMG]"
-                print(f"  - {p['title']}: {p['price']} {img_status}")
-            if len(products) > 5:
-                print(f"  ... and {len(products) - 5} more")
+def _loose_link_image(link):
+    """Find an image for a product link that is outside any container."""
+    if isinstance(link, Tag):
+        parent = link.find_parent(["div", "li", "article", "section"])
+        img_el = parent.select_one("img") if parent else None
+    else:
+        parent = next((el for el in link.iterancestors() if el.tag in ("div", "li", "article", "section")), None)
+        img_el = parent.find(".//img") if parent is not None else None
 
-            if not has_next_page(soup, page):
-                print("No next page found. Stopping.")
-                break
+    img_src = (img_el.get("src") or img_el.get("data-src")) if img_el is not None else None
+    if not img_src:
+        return "N/A"
+    if img_src.startswith("//"):
+        img_src = "https:" + img_src
+    return img_src
+
+
+def has_next_page(page, current_page):
+    """Check if there's a next page."""
+    next_page = current_page + 1
+    if isinstance(page, Tag):
+        # Look for next page link
+        if page.select_one(f"a[href*='page={next_page}']"):
+            return True
+        # Check for "Next" button
+        next_btn = page.find("a", string=lambda x: x and "next" in x.lower() if x else False)
+        return next_btn is not None
+
+    for link in page.iter("a"):
+        if f"page={next_page}" in (link.get("href") or ""):
+            return True
+        if "next" in _text(link).lower():
+            return True
+    return False
+
+
+def scrape_page(pool, page, base_url=BASE_URL, save_folder=None):
+    """Scrape one collection page with a pooled driver.
+
+    Returns `(products, has_next)`, or `(None, False)` if the page failed,
+    including when no browser could be started for it.
+    With `save_folder`, the rendered HTML is kept for benchmarks.
+    """
+    url = f"{base_url}?page={page}"
+    html = None
+    for attempt in range(1, PAGE_RETRIES + 1):
+        if attempt > 1:
+            metrics.count("page.retries")
+        try:
+            with pool.driver() as driver:
+                print(f"Scraping page {page}: {url}" + (f" (attempt {attempt})" if attempt > 1 else ""))
+                html = fetch_page_selenium(driver, url)
+                if not html:
+                    # The browser may have crashed; start a fresh one for the retry
+                    pool.discard(driver)
+                # Keep each browser polite before it is handed the next page
+                with metrics.span("page.delay"):
+                    time.sleep(random.uniform(*PAGE_DELAY))
+        except Exception as e:
+            # Chrome failed to start: back off and retry like a failed load
+            metrics.count(f"driver.errors.{type(e).__name__}")
+            print(f"Page {page}: could not start a browser: {e}")
+        if html:
+            break
+        if attempt < PAGE_RETRIES:
+            time.sleep(RETRY_BACKOFF * attempt)
+    if not html:
+        metrics.count("pages.failed")
+        return None, False
+    metrics.count("pages.fetched")
+
+    if save_folder:
+        os.makedirs(save_folder, exist_ok=True)
+        with open(os.path.join(save_folder, f"page-{page:03d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+    with metrics.span("page.parse"):
+        root = parse_html(html)
+        return parse_products(root), has_next_page(root, page)
+
+
+def report_page(page, products, total):
+    """Print a short summary of one scraped page."""
+    print(f"\n{'='*50}")
+    print(f"Page {page}: found {len(products)} products (Total: {total})")
+
+    # Print first 5 products with image info
+    for p in products[:5]:
+        img_status = "[IMG]" if p['image'] != "N/A" else "[NO IMG]"
+        print(f"  - {p['title']} {img_status}")
+    if len(products) > 5:
+        print(f"  ... and {len(products) - 5} more")
+
+
+def scrape_with_selenium(headless=True, workers=MAX_DRIVERS, base_url=BASE_URL, max_pages=MAX_PAGES,
+                         save_folder=None, on_page=None, resume=False):
+    """Main scraping function using Selenium.
+
+    Up to `workers` collection pages are fetched at once, each by its own
+    browser. Pages are handed on in order as soon as every earlier page is
+    done, and the crawl stops at the first page that fails, is empty or has
+    no next page.
+
+    A product listed on several collection pages is kept only the first
+    time its key (see `dedup_key`) is seen anywhere in the crawl.
+
+    Each page's products are passed to `on_page(page, products)` if given
+    (and then not accumulated); otherwise all products are returned.
+
+    Every finished page is checkpointed in JOURNAL_FILE. With `resume`,
+    pages completed by an earlier, interrupted crawl are taken from the
+    journal instead of being fetched again.
+    """
+    all_products = []
+    total = 0
+    duplicates = 0
+    seen = set()        # Keys of every product handed on so far
+    results = {}
+    next_page = 1       # Next page to schedule
+    next_report = 1     # Next page to hand on, in order
+    last_page = max_pages
+
+    journal = CrawlJournal(base_url=base_url, resume=resume)
+    if journal.pages:
+        print(f"Resuming: {len(journal.pages)} page(s) already done in {JOURNAL_FILE}")
 
-            page += 1
-            delay = random.uniform(2, 4)
-            print(f"Waiting {delay:.1f}s before next request...")
-            time.sleep(delay)
+    print(f"Starting {workers} Selenium WebDriver(s)...")
+    pool = DriverPool(size=workers, headless=headless)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            while running or next_page <= last_page:
+                # Keep one page in flight per browser; replay journaled pages directly
+                while len(running) < workers and next_page <= last_page:
+                    checkpoint = journal.completed(next_page)
+                    if checkpoint:
+                        results[next_page] = checkpoint[0]
+                        if not checkpoint[1]:
+                            last_page = min(last_page, next_page)
+                    else:
+                        running[executor.submit(scrape_page, pool, next_page, base_url, save_folder)] = next_page
+                    next_page += 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED) if running else ((), ())
+                for future in done:
+                    page = running.pop(future)
+                    products, has_next = future.result()
+                    journal.record(page, products, has_next)
+                    results[page] = products
+                    if not products or not has_next:
+                        last_page = min(last_page, page)
+
+                while next_report <= last_page and next_report in results:
+                    products = results.pop(next_report)
+                    if products is None:
+                        print(f"\nPage {next_report}: failed to fetch page. Stopping.")
+                    elif not products:
+                        print(f"\nPage {next_report}: no products found. Stopping.")
+                    else:
+                        fresh = [p for p in products if dedup_key(p) not in seen]
+                        seen.update(dedup_key(p) for p in fresh)
+                        duplicates += len(products) - len(fresh)
+                        products = fresh
+                        total += len(products)
+                        report_page(next_report, products, total)
+                        if on_page:
+                            on_page(next_report, products)
+                        else:
+                            all_products.extend(products)
+                    next_report += 1
 
     finally:
-        print("\nClosing browser...")
-        driver.quit()
+        print("\nClosing browsers...")
+        pool.close()
+        journal.close()
+
+    if duplicates:
+        print(f"Merged {duplicates} product(s) repeated across pages")
+    metrics.count("products", total)
+    metrics.count("products.duplicates", duplicates)
 
     return all_products
 
 
-def main():
+def main(workers=MAX_DRIVERS, base_url=BASE_URL, headless=True, save_folder=None, resume=False, profile=()):
     """Entry point."""
+    run = metrics.start("scraper", profile)
     print("Web Scraper with Selenium (JavaScript Rendering)")
     print("=" * 50)
 
-    # Set headless=False to see the browser in action
-    products = scrape_with_selenium(headless=True)
+    # Pass headless=False (--show-browser) to see the browser in action
+    with metrics.stage("crawl"):
+        products = scrape_with_selenium(headless=headless, workers=workers, base_url=base_url,
+                                        save_folder=save_folder, resume=resume)
 
     if products:
-        save_to_csv(products, OUTPUT_FILE)
+        # The catalog is written first; products.csv is exported from it
+        with metrics.stage("save"), Catalog() as catalog:
+            changed, removed = catalog.sync(products)
+            catalog.export_csv(OUTPUT_FILE)
+        print(f"Catalog updated: {changed} changed, {removed} removed")
+        print(f"Saved {len(products)} products to {OUTPUT_FILE}")
         print(f"\nScraping complete! Total: {len(products)} products")
     else:
         print("\nNo products scraped.")
+    print(run.report())
+    print(f"Metrics saved to: {run.save()}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape product titles and images from the collection pages")
+    parser.add_argument("--workers", type=int, default=MAX_DRIVERS,
+                        help="number of browsers scraping pages in parallel")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="collection URL to crawl, e.g. a local fixture server")
+    parser.add_argument("--show-browser", action="store_true",
+                        help="run Chrome with a visible window")
+    parser.add_argument("--save-pages", metavar="FOLDER",
+                        help="also save each rendered page's HTML (e.g. for benchmarks/bench_parse.py)")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"continue an interrupted crawl from {JOURNAL_FILE}")
+    parser.add_argument("--profile", metavar="STAGES", type=metrics.parse_profile, default=set(),
+                        help="run these comma-separated stages (crawl, save or all) under cProfile")
+    args = parser.parse_args()
+    main(workers=args.workers, base_url=args.base_url, headless=not args.show_browser,
+         save_folder=args.save_pages, resume=args.resume, profile=args.profile)
@@ -0,0 +1,222 @@
+import argparse
+import email.utils
+import os
+import re
+import statistics
+import threading
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build_dist import DIST_FOLDER, HASH_LENGTH
+from image_store import STORE_FOLDER
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 8000
+# Precompressed siblings written by build_dist.py, in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+IMMUTABLE = "public, max-age=31536000, immutable"   # Content-hashed assets never change
+REVALIDATE = "no-cache"                             # Everything else is checked by ETag
+# build_dist.py's hashed names (site.<hash>.css), and the image store's blobs (<digest>.jpg)
+BLOB_FOLDER = re.escape(STORE_FOLDER.replace(os.sep, "/"))
+HASHED_ASSET = re.compile(rf"(\.[0-9a-f]{{{HASH_LENGTH}}}|/{BLOB_FOLDER}/[0-9a-f]{{16}})\.\w+$")
+
+
+def parse_range(header, size):
+    """Parse a single ``bytes=`` range into `(start, end)` inclusive.
+
+    Returns None when the header should be ignored (absent, malformed or
+    multi-range) and "unsatisfiable" when no byte of it is in the file.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if not match or not (match[1] or match[2]):
+        return None
+    if not match[1]:
+        length = int(match[2])
+        return (max(size - length, 0), size - 1) if length and size else "unsatisfiable"
+    start = int(match[1])
+    end = min(int(match[2]), size - 1) if match[2] else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, end
+
+
+class LatencyLog:
+    """Collects response times so the server can summarise them on exit."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.times = []
+
+    def add(self, ms):
+        with self.lock:
+            self.times.append(ms)
+
+    def summary(self):
+        if not self.times:
+            return "No requests served"
+        times = sorted(self.times)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        return (f"{len(times)} request(s): median {statistics.median(times):.1f} ms, "
+                f"p95 {p95:.1f} ms, max {times[-1]:.1f} ms")
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Static file handler that behaves like the production web server.
+
+    It serves the .br/.gz sibling of a file when the client accepts it,
+    answers conditional requests from an ETag, marks content-hashed
+    assets immutable, serves single byte ranges and logs each request's
+    latency once the response has been written.
+    """
+
+    protocol_version = "HTTP/1.1"   # Keep-alive, as browsers expect
+
+    def __init__(self, *args, latency=None, **kwargs):
+        self.latency = latency
+        super().__init__(*args, **kwargs)
+
+    def handle_one_request(self):
+        self.start = time.perf_counter()
+        self.status = None
+        self.encoding = ""
+        super().handle_one_request()
+        if self.status is not None:
+            ms = (time.perf_counter() - self.start) * 1000
+            if self.latency is not None:
+                self.latency.add(ms)
+            self.log_message('"%s" %s %s%s %.1f ms', self.requestline, self.status,
+                             self.body_size, f" {self.encoding}" if self.encoding else "", ms)
+
+    def log_request(self, code="-", size="-"):
+        # Logged by handle_one_request once the body is written, with its latency
+        self.status = int(code) if isinstance(code, (int, HTTPStatus)) else code
+        self.body_size = 0
+
+    def select_variant(self, path):
+        """Return `(path to read, content encoding)` for the client's Accept-Encoding."""
+        accepted = {part.split(";")[0].strip() for part in self.headers.get("Accept-Encoding", "").split(",")}
+        for encoding, ext in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + ext):
+                return path + ext, encoding
+        return path, ""
+
+    def etag(self, stat, encoding):
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+
+    def not_modified(self, etag, stat):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(stat.st_mtime) <= since
+        return False
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?")[0].endswith("/") or not os.path.isfile(index):
+                return super().send_head()
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        source, self.encoding = self.select_variant(path)
+        stat = os.stat(source)
+        etag = self.etag(stat, self.encoding)
+        headers = {
+            "Content-Type": self.guess_type(path),
+            "ETag": etag,
+            "Last-Modified": self.date_time_string(stat.st_mtime),
+            "Cache-Control": IMMUTABLE if HASHED_ASSET.search(path.replace(os.sep, "/")) else REVALIDATE,
+            "Vary": "Accept-Encoding",
+            "Accept-Ranges": "bytes",
+        }
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+
+        if self.not_modified(etag, stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name in ("ETag", "Cache-Control", "Vary"):
+                self.send_header(name, headers[name])
+            self.end_headers()
+            return None
+
+        start, end = 0, stat.st_size - 1
+        byte_range = parse_range(self.headers.get("Range"), stat.st_size)
+        if_range = self.headers.get("If-Range")
+        if byte_range and if_range and if_range.strip() != etag:
+            byte_range = None   # The client's copy is stale: send the whole file
+        if byte_range == "unsatisfiable":
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{stat.st_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        if byte_range:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        else:
+            self.send_response(HTTPStatus.OK)
+        headers["Content-Length"] = str(end - start + 1)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        return source, start, end - start + 1
+
+    def do_GET(self):
+        head = self.send_head()
+        if not head:
+            return
+        if not isinstance(head, tuple):   # Directory listing from the base class
+            try:
+                self.body_size = len(head.getbuffer())
+                self.copyfile(head, self.wfile)
+            finally:
+                head.close()
+            return
+        source, offset, count = head
+        with open(source, "rb") as f:
+            # sendfile() copies straight from the page cache to the socket
+            self.body_size = self.connection.sendfile(f, offset, count)
+
+    def do_HEAD(self):
+        head = self.send_head()
+        if head and not isinstance(head, tuple):
+            head.close()
+
+
+def main(root=None, host=HOST, port=PORT):
+    root = root or (DIST_FOLDER if os.path.isdir(DIST_FOLDER) else ".")
+    latency = LatencyLog()
+    handler = partial(PreviewHandler, directory=root, latency=latency)
+    with ThreadingHTTPServer((host, port), handler) as server:
+        print(f"Serving {os.path.abspath(root)} at http://{host}:{port}/")
+        print("Press Ctrl+C to stop")
+        print("=" * 50)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print("=" * 50)
+    print(latency.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preview the site with production-like compression and caching")
+    parser.add_argument("--root", default=None,
+                        help=f"folder to serve (default: {DIST_FOLDER}/ if built, else the project)")
+    parser.add_argument("--host", default=HOST, help=f"address to listen on (default: {HOST})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"port to listen on (default: {PORT})")
+    args = parser.parse_args()
+    main(root=args.root, host=args.host, port=args.port)
@@ -0,0 +1,173 @@
+import builtins
+import glob
+import hashlib
+import html
+import os
+import re
+import types
+
+# Configuration
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+BUFFER_SIZE = 65536   # Characters collected before each write to the output file
+
+TAG = re.compile(r"\{\{(.*?)\}\}|\{%(.*?)%\}", re.S)
+RAW = re.compile(r"\|\s*raw\s*$")
+
+
+class TemplateError(ValueError):
+    """A template that does not compile, reported with its file and line."""
+
+
+def escape(value):
+    """HTML-escape a value for the page; None renders as nothing."""
+    return "" if value is None else html.escape(str(value))
+
+
+class Template:
+    """A template compiled once into a Python generator function.
+
+    ``{{ expr }}`` inserts a Python expression, HTML-escaped unless it ends
+    in ``|raw``. ``{% if %}``/``{% elif %}``/``{% else %}``/``{% endif %}``
+    and ``{% for x in xs %}``/``{% endfor %}`` work as in Python, and
+    ``{% include "name.html", key=value %}`` renders another template with
+    this one's context plus the given keywords (loop variables must be
+    passed that way). Text between tags is copied as it is.
+
+    Rendering yields the page piece by piece, so nothing larger than one
+    piece needs to be held in memory.
+    """
+
+    def __init__(self, source, name="<template>"):
+        self.name = name
+        code, lines = self._translate(source)
+        try:
+            namespace = {}
+            exec(compile(code, name, "exec"), namespace)
+        except SyntaxError as e:
+            line = lines[e.lineno - 1] if e.lineno and e.lineno <= len(lines) else "?"
+            raise TemplateError(f"{name}, line {line}: {e.msg}") from None
+        self.code = namespace["_render"].__code__
+
+    def _translate(self, source):
+        """Return the Python source of the render function and, per line, its template line."""
+        code = ["def _render():"]
+        lines = [1]
+        blocks = []
+
+        def emit(statement, line):
+            code.append("    " * (len(blocks) + 1) + statement)
+            lines.append(line)
+
+        pos = 0
+        for match in TAG.finditer(source):
+            line = source.count("\n", 0, match.start()) + 1
+            if match.start() > pos:
+                emit(f"yield {source[pos:match.start()]!r}", line)
+            pos = match.end()
+
+            if match[1] is not None:
+                expr = match[1].strip()
+                if RAW.search(expr):
+                    emit(f"yield str({RAW.sub('', expr)})", line)
+                else:
+                    emit(f"yield _escape({expr})", line)
+                continue
+
+            keyword, _, args = match[2].strip().partition(" ")
+            if keyword in ("if", "for"):
+                emit(f"{keyword} {args}:", line)
+                blocks.append(keyword)
+            elif keyword in ("elif", "else"):
+                if not blocks or blocks[-1] != "if":
+                    raise TemplateError(f"{self.name}, line {line}: {keyword} outside an if block")
+                blocks.pop()
+                emit(f"elif {args}:" if keyword == "elif" else "else:", line)
+                blocks.append("if")
+            elif keyword in ("endif", "endfor"):
+                if not blocks or blocks[-1] != keyword[3:]:
+                    raise TemplateError(f"{self.name}, line {line}: unexpected {keyword}")
+                blocks.pop()
+                continue
+            elif keyword == "include":
+                emit(f"yield from _include(_context, {args})", line)
+                continue
+            else:
+                raise TemplateError(f"{self.name}, line {line}: unknown tag {keyword!r}")
+            emit("pass", line)   # The block may be empty
+
+        if blocks:
+            raise TemplateError(f"{self.name}: unclosed {blocks[-1]} block")
+        if pos < len(source):
+            emit(f"yield {source[pos:]!r}", source.count("\n", 0, pos) + 1)
+        emit("yield from ()", 0)   # A generator even when there is nothing to yield
+        return "\n".join(code), lines
+
+    def stream(self, **context):
+        """Yield the rendered text in pieces."""
+        namespace = dict(context, _context=context, _escape=escape, _include=_include, __builtins__=builtins)
+        return types.FunctionType(self.code, namespace)()
+
+    def render(self, **context):
+        return "".join(self.stream(**context))
+
+
+_cache = {}
+
+
+def get_template(name):
+    """Load and compile ``templates/<name>`` once per process."""
+    template = _cache.get(name)
+    if template is None:
+        with open(os.path.join(TEMPLATE_FOLDER, name), "r", encoding="utf-8") as f:
+            source = f.read()
+        # Files end with a newline; the fragments they hold do not
+        template = _cache[name] = Template(source[:-1] if source.endswith("\n") else source, name)
+    return template
+
+
+def _include(context, name, **values):
+    return get_template(name).stream(**dict(context, **values))
+
+
+def render(name, **context):
+    return get_template(name).render(**context)
+
+
+def stream(name, **context):
+    return get_template(name).stream(**context)
+
+
+def paths():
+    """Every template file, so build caches can be invalidated when one changes."""
+    return sorted(glob.glob(os.path.join(TEMPLATE_FOLDER, "*.html")))
+
+
+def version():
+    """Hash of every template file: changes whenever any template is edited."""
+    digest = hashlib.sha1()
+    for path in paths():
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def write(filepath, chunks):
+    """Write streamed text to `filepath` atomically, a buffer at a time.
+
+    Returns the number of bytes written.
+    """
+    tmp_file = filepath + ".tmp"
+    size = 0
+    buffer = []
+    buffered = 0
+    with open(tmp_file, "wb") as f:
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= BUFFER_SIZE:
+                size += f.write("".join(buffer).encode("utf-8"))
+                buffer.clear()
+                buffered = 0
+        size += f.write("".join(buffer).encode("utf-8"))
+    os.replace(tmp_file, filepath)
+    return size
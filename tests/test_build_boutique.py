@@ -0,0 +1,21 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import build_boutique
+from categories import CATEGORY_RULES
+
+
+def test_folder_categories_come_from_the_rules():
+    categories = {category for category, _ in CATEGORY_RULES}
+    assert build_boutique.folder_category("Bags") == "bag"
+    assert build_boutique.folder_category("Sandales") == "sandales"
+    assert all(build_boutique.folder_category(folder) in categories for folder in build_boutique.FOLDERS)
+
+
+def test_every_page_can_filter_every_folder():
+    categories = {build_boutique.folder_category(folder) for folder in build_boutique.FOLDERS}
+    for page in build_boutique.PAGES:
+        assert build_boutique.missing_filters(os.path.join(ROOT, page), categories) == []
@@ -0,0 +1,29 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build_dist
+import serve
+
+
+def test_feed_files_get_hashed_names_the_page_points_at(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("gallery-data")
+    for name in ("products-000.json", "search.json"):
+        (tmp_path / "gallery-data" / name).write_text('{"id":1}', encoding="utf-8")
+    feed = {"chunks": ["gallery-data/products-000.json"], "searchIndex": "gallery-data/search.json"}
+
+    manifest = build_dist.build_assets("dist")
+    page = build_dist.rewrite_references(f"const feed = {json.dumps(feed)};", manifest)
+    feed = json.loads(page[len("const feed = "):-1])
+    for path in (*feed["chunks"], feed["searchIndex"]):
+        assert path in manifest.values() and os.path.exists(os.path.join("dist", path))
+        assert serve.HASHED_ASSET.search("/dist/" + path)
+
+
+def test_store_blobs_are_immutable():
+    assert serve.HASHED_ASSET.search("/site/images/blobs/3f2a9c0e1b7d4a55.jpg")
+    assert not serve.HASHED_ASSET.search("/site/images/0001_body-wave-wig.jpg")
+    assert not serve.HASHED_ASSET.search("/site/gallery-data/products-000.json")
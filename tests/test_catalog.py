@@ -0,0 +1,61 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import catalog
+
+PRODUCTS = [
+    {"title": "Body Wave Wig", "image": "https://cdn.example.com/wig.jpg", "handle": "body-wave-wig"},
+    {"title": "Straight Bundle", "image": "https://cdn.example.com/bundle.jpg", "handle": "straight-bundle"},
+]
+
+
+def write_csv(path, products):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=catalog.CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(products)
+
+
+def test_load_products_imports_the_csv_once(tmp_path, capsys):
+    csv_file, catalog_file = str(tmp_path / "products.csv"), str(tmp_path / "catalog.db")
+    write_csv(csv_file, PRODUCTS)
+    with catalog.Catalog(catalog_file) as db:
+        db.import_csv(csv_file)
+    capsys.readouterr()
+
+    # A CSV rewritten with the same rows is newer than the catalog but needs
+    # importing only once
+    write_csv(csv_file, PRODUCTS)
+    os.utime(csv_file, ns=(os.stat(catalog_file).st_mtime_ns + 10**9,) * 2)
+    assert [p["handle"] for p in catalog.load_products(csv_file, catalog_file)] == ["body-wave-wig", "straight-bundle"]
+    assert "Imported" in capsys.readouterr().out
+    catalog.load_products(csv_file, catalog_file)
+    assert capsys.readouterr().out == ""
+
+    write_csv(csv_file, PRODUCTS[:1])
+    assert len(catalog.load_products(csv_file, catalog_file)) == 1
+    assert "(0 changed, 1 removed)" in capsys.readouterr().out
+
+
+def test_export_leaves_the_catalog_in_sync(tmp_path):
+    csv_file, catalog_file = str(tmp_path / "products.csv"), str(tmp_path / "catalog.db")
+    with catalog.Catalog(catalog_file) as db:
+        db.sync(PRODUCTS)
+        db.export_csv(csv_file)
+        assert db.in_sync_with(csv_file)
+
+
+def test_upsert_without_positions_rejects_rows_without_a_handle(tmp_path):
+    with catalog.Catalog(str(tmp_path / "catalog.db")) as db:
+        db.upsert(PRODUCTS)
+        assert db.upsert(PRODUCTS) == 0
+        with pytest.raises(ValueError):
+            db.upsert([{"title": "Lace Closure", "image": ""}])
+        assert db.upsert([{"title": "Lace Closure", "image": ""}], positions=[3]) == 1
+        assert db.upsert([{"title": "Lace Closure", "image": ""}], positions=[3]) == 0
+        assert len(db.products()) == 3
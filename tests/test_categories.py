@@ -0,0 +1,27 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categories import CATEGORY_RULES, Classifier
+
+TITLES = ["Virgin Brazilian Body Wave Bundle", "Kinky Curly Closure", "Straight Lace Wig", "Leather Tote"]
+
+
+def test_overlapping_keywords_keep_every_category():
+    classifier = Classifier([("body wave", ["body wave"]), *CATEGORY_RULES])
+    assert classifier.classify("Virgin Brazilian Body Wave Bundle") == ("body wave", "wave", "bundle")
+
+
+def test_keyword_shared_by_several_rules_gives_each_category():
+    classifier = Classifier([("hair", ["wave", "curl"]), ("wave", ["wave"]), ("curly", ["curly"])])
+    assert classifier.classify("Curly Wave") == ("hair", "wave", "curly")
+    # "curly" starts where the shorter "curl" does; both still count
+    assert classifier.classify("curly") == ("hair", "curly")
+
+
+def test_classify_all_matches_classify():
+    classifier = Classifier([("body wave", ["body wave"]), *CATEGORY_RULES])
+    expected = [Classifier([("body wave", ["body wave"]), *CATEGORY_RULES]).classify(title) for title in TITLES]
+    assert classifier.classify_all(TITLES + TITLES[:1]) == expected + expected[:1]
+    assert classifier.classify_all(["Leather Tote"]) == [("bundle",)]
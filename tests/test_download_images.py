@@ -0,0 +1,23 @@
+import argparse
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import download_images
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "-0.5"])
+def test_rate_must_be_positive(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        download_images.positive(float)(value)
+    with pytest.raises(ValueError):
+        download_images.TokenBucket(float(value), download_images.RATE_BURST)
+
+
+def test_burst_must_allow_one_request():
+    assert download_images.positive(int)("3") == 3
+    with pytest.raises(ValueError):
+        download_images.TokenBucket(download_images.RATE_LIMIT, 0)
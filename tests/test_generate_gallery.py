@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+import generate_gallery
+
+PRODUCTS = [
+    {"title": "Body Wave Wig", "image": "https://cdn.example.com/wig.jpg", "handle": "body-wave-wig"},
+    {"title": "Straight Bundle", "image": "https://cdn.example.com/bundle.jpg", "handle": "straight-bundle"},
+]
+IMAGES = ["images/blobs/0123456789abcdef.jpg", generate_gallery.PLACEHOLDER_IMAGE]
+
+
+def build(cache):
+    with catalog.Catalog() as db:
+        products = db.products()
+    thumbnails = [{}] * len(products)
+    known = generate_gallery.reusable_fingerprints(cache, products, IMAGES, thumbnails)
+    fingerprints = generate_gallery.product_fingerprints(products, IMAGES, thumbnails, known=known)
+    cache["hidden"] = []
+    cache["products"] = {p["key"]: [image, {}, key] for p, image, key in zip(products, IMAGES, fingerprints)}
+    return known, fingerprints
+
+
+def test_incremental_build_rehashes_only_products_changed_in_the_catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with catalog.Catalog() as db:
+        db.sync(PRODUCTS)
+    cache = {}
+    known, first = build(cache)
+    assert known == {}
+
+    known, again = build(cache)
+    assert set(known) == {"body-wave-wig", "straight-bundle"} and again == first
+
+    with catalog.Catalog() as db:
+        db.sync([dict(PRODUCTS[0], title="Body Wave Wig 24in"), PRODUCTS[1]])
+    known, changed = build(cache)
+    assert set(known) == {"straight-bundle"}
+    assert changed[0] != first[0] and changed[1] == first[1]
+
+    # A catalog recreated in place restarts its change numbers, so nothing is reused
+    os.remove("catalog.db")
+    with catalog.Catalog() as db:
+        db.sync([dict(PRODUCTS[0], title="Body Wave Wig 24in"), PRODUCTS[1]])
+        db.sync(PRODUCTS)
+    assert build(cache)[0] == {}
+
+
+def test_card_template_has_every_part_the_page_fills_in():
+    template = generate_gallery.card_template()
+    for hook in ('data-field="price"', 'data-field="badge"', 'data-field="title"', "<source ", " srcset="):
+        assert hook in template
+    assert 'data-field="price"' not in generate_gallery.card_template(frozenset({"price"}))
+    # Server-rendered cards come from the same template
+    card = generate_gallery.render_card(1, "Body Wave Wig", ("wig",), "images/blobs/0123456789abcdef.jpg")
+    assert 'data-field="title"' in card and "<source " not in card
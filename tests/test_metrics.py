@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+
+def test_runs_started_in_the_same_second_keep_their_own_file(tmp_path):
+    paths = set()
+    for n in range(5):
+        run = metrics.Metrics("scraper")
+        run.count("pages.fetched", n)
+        paths.add(run.save(folder=str(tmp_path)))
+    assert len(paths) == 5
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths)
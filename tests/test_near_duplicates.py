@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build_boutique
+import near_duplicates
+
+PAGE = f"""<img src="Bags/0001_hero.jpeg">
+{build_boutique.START_MARKER} (0123456789ab) -->
+<img src="Bags/0002_COACH BAG.jpeg">
+{build_boutique.END_MARKER}
+<a href="Bags/0037_FASHION &amp; BAG.jpeg">Fashion</a>
+"""
+
+
+def test_only_hand_written_links_pin_a_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "boutique.html").write_text(PAGE, encoding="utf-8")
+    (tmp_path / "gallery.html").write_text('<img src="Bags/0001_hero.jpeg">', encoding="utf-8")
+    pages = near_duplicates.page_references()
+
+    assert near_duplicates.referencing_pages("Bags/0001_hero.jpeg", pages) == ["boutique.html"]
+    # Generated cards are rebuilt after a merge, so they do not keep a duplicate
+    assert near_duplicates.referencing_pages("Bags/0002_COACH BAG.jpeg", pages) == []
+    assert near_duplicates.referencing_pages("Bags/0037_FASHION & BAG.jpeg", pages) == ["boutique.html"]
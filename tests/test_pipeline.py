@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+
+
+def test_failed_fetch_releases_waiting_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("images")
+
+    def fetch_into_store(*args, **kwargs):
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(pipeline, "fetch_into_store", fetch_into_store)
+    downloader = pipeline.Downloader(workers=3)
+    # Rows sharing a URL wait on the row that fetches it
+    for n in range(1, 4):
+        downloader.put(f"{n:04d}", f"Wig {n}", "https://cdn.example.com/wig.jpg?width=500")
+    downloader.put("0004", "Bundle", "https://cdn.example.com/bundle.jpg")
+
+    closer = threading.Thread(target=downloader.close, daemon=True)
+    closer.start()
+    closer.join(timeout=10)
+    assert not closer.is_alive(), "close() hung waiting for a failed fetch"
+    assert downloader.counts == {"downloaded": 0, "failed": 4}
@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import scraper
+
+CARD = """
+<div class="product-card">
+  <a href="/collections/{collection}/products/{handle}"><img src="//cdn.example.com/{handle}.jpg"></a>
+  <a href="/products/{handle}?variant=1" title="{title}">{title}</a>
+  <a href="/products/{handle}">View</a>
+</div>
+"""
+
+
+def page_html():
+    cards = [
+        CARD.format(collection="wigs", handle="body-wave-wig", title="Body Wave Wig"),
+        CARD.format(collection="bundles", handle="straight-bundle", title="Straight Bundle"),
+        CARD.format(collection="closures", handle="lace-closure", title="Lace Closure"),
+    ]
+    return f'<html><body><div class="grid">{"".join(cards)}</div></body></html>'
+
+
+def parse(html):
+    if scraper.lxml_etree is not None:
+        return scraper.parse_products(html)
+    return scraper.parse_products(BeautifulSoup(html, "html.parser"))
+
+
+def test_card_links_with_variants_and_collection_paths_are_one_product():
+    products = parse(page_html())
+    assert [p["handle"] for p in products] == ["body-wave-wig", "straight-bundle", "lace-closure"]
+    assert [p["title"] for p in products] == ["Body Wave Wig", "Straight Bundle", "Lace Closure"]
+    assert products[0]["image"] == "https://cdn.example.com/body-wave-wig.jpg"
+
+
+def test_html_parser_fallback_matches_lxml():
+    html = page_html()
+    assert scraper.parse_products(BeautifulSoup(html, "html.parser")) == parse(html)
+
+
+def test_browser_that_fails_to_start_is_retried_then_journaled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "RETRY_BACKOFF", 0)
+    attempts = []
+
+    def create_driver(**kwargs):
+        attempts.append(kwargs)
+        raise RuntimeError("chrome not reachable")
+
+    monkeypatch.setattr(scraper, "create_driver", create_driver)
+    assert scraper.scrape_with_selenium(workers=1, max_pages=1) == []
+    assert len(attempts) == scraper.PAGE_RETRIES
+    with open(scraper.JOURNAL_FILE, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[-1]["page"] == 1 and entries[-1]["status"] == "failed"
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from image_store import file_digest
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is only needed to build thumbnails, not to read the manifest
+    Image = None
+
+# Configuration
+SOURCE_FOLDERS = ["images", "Bags", "Sandales"]
+THUMBS_FOLDER = "thumbs"
+MANIFEST_FILE = os.path.join(THUMBS_FOLDER, "manifest.json")
+WIDTHS = (240, 480, 720)
+QUALITY = {"webp": 80, "avif": 60}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+# Card image widths at the gallery's grid breakpoints
+SIZES = "(min-width: 1280px) 256px, (min-width: 1024px) 25vw, (min-width: 640px) 33vw, 50vw"
+
+
+def available_formats():
+    """Return the output formats this Pillow build can encode, best first."""
+    formats = ["webp"]
+    try:
+        from PIL import features
+        if features.check("avif"):
+            formats.insert(0, "avif")
+    except (ImportError, ValueError):
+        pass
+    return formats
+
+
+def find_sources(folders=SOURCE_FOLDERS):
+    """List every image below `folders` as a site-relative path."""
+    sources = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    sources.append(os.path.join(root, name).replace(os.sep, "/"))
+    return sources
+
+
+def variant_path(digest, width, fmt):
+    """Return the thumbnail path for one width/format of a source image."""
+    return f"{THUMBS_FOLDER}/{digest[:16]}-{width}.{fmt}"
+
+
+def target_widths(source_width):
+    """Pick the widths to generate, never upscaling the source."""
+    widths = [w for w in WIDTHS if w < source_width]
+    if len(widths) < len(WIDTHS):
+        widths.append(min(source_width, WIDTHS[-1]))
+    return widths
+
+
+def make_variants(source, formats):
+    """Build every thumbnail of `source`. Runs in a worker process.
+
+    Thumbnails are named after the source's content hash, so files already
+    produced for identical content (a renamed or duplicated image) are kept.
+    """
+    digest = file_digest(source)
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        width, height = img.size
+
+        variants = {fmt: {} for fmt in formats}
+        for w in target_widths(width):
+            resized = None
+            for fmt in formats:
+                path = variant_path(digest, w, fmt)
+                if not os.path.exists(path):
+                    if resized is None:
+                        resized = img.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    resized.save(tmp_path, format=fmt.upper(), quality=QUALITY[fmt])
+                    os.replace(tmp_path, path)
+                variants[fmt][str(w)] = path
+
+    stat = os.stat(source)
+    return {
+        "hash": digest,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "width": width,
+        "height": height,
+        "variants": variants,
+    }
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Load the thumbnail manifest (source path -> entry), or {} if missing."""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def srcsets(entry):
+    """Return ``{format: "path 240w, path 480w"}`` for a manifest entry."""
+    if not entry:
+        return {}
+    return {
+        fmt: ", ".join(f"{path} {w}w" for w, path in sorted(paths.items(), key=lambda item: int(item[0])))
+        for fmt, paths in entry["variants"].items()
+        if paths
+    }
+
+
+def is_current(entry, source, formats):
+    """True if `entry` still describes `source` and all its files exist."""
+    if not entry:
+        return False
+    stat = os.stat(source)
+    if entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+        return False
+    if any(fmt not in entry["variants"] for fmt in formats):
+        return False
+    return all(os.path.exists(path) for paths in entry["variants"].values() for path in paths.values())
+
+
+def main(workers=None):
+    if Image is None:
+        print("Pillow is required to build thumbnails: pip install Pillow")
+        return
+
+    os.makedirs(THUMBS_FOLDER, exist_ok=True)
+    formats = available_formats()
+    manifest = load_manifest()
+    sources = find_sources()
+
+    pending = [source for source in sources if not is_current(manifest.get(source), source, formats)]
+    print(f"Found {len(sources)} images, {len(pending)} need thumbnails ({', '.join(formats)})")
+    print("=" * 50)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(make_variants, source, formats): source for source in pending}
+        for n, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+            try:
+                manifest[source] = future.result()
+                print(f"[{n}/{len(pending)}] {source} OK")
+            except Exception as e:
+                print(f"[{n}/{len(pending)}] {source} - Error: {e}")
+                failed += 1
+
+    # Forget sources that no longer exist
+    manifest = {source: manifest[source] for source in sources if source in manifest}
+    tmp_file = MANIFEST_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+    print("=" * 50)
+    print(f"Thumbnails: {len(manifest)}")
+    print(f"Failed: {failed}")
+    print(f"Manifest saved to: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build resized WebP/AVIF thumbnails for the site images")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    main(workers=args.workers)